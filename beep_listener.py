@@ -3,10 +3,10 @@ import os
 import socket
 import subprocess
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from config import LOG_LEVEL, LOG_LEVELS, LOG_QUEUE_SIZE, LOG_RING_SIZE
+from log_setup import setup_logging
+
+logger = logging.getLogger("beep_listener")
 
 # Network settings
 UDP_IP = "127.0.0.1"
@@ -20,21 +20,24 @@ SOUND_PATH = os.path.join(SCRIPT_DIR, "assets/sounds/beep.mp3")
 def play_beep():
     """Plays the sound using ffplay."""
     if not os.path.exists(SOUND_PATH):
-        logging.error(f"Sound file not found: {SOUND_PATH}")
+        logger.error(f"Sound file not found: {SOUND_PATH}")
         return
 
     try:
-        logging.info("🔊 Playing beep...")
-        logging.info(" ".join(["ffplay", "-nodisp", "-autoexit", SOUND_PATH]))
+        logger.info("🔊 Playing beep...")
+        logger.info(" ".join(["ffplay", "-nodisp", "-autoexit", SOUND_PATH]))
         # -nodisp: no video, -autoexit: exit when done, -loglevel quiet: no logs
         _ = subprocess.Popen(["ffplay", "-nodisp", "-autoexit", SOUND_PATH])
     except Exception as e:
-        logging.error(f"Failed to play sound: {e}")
+        logger.error(f"Failed to play sound: {e}")
 
 
 def main():
+    # Configure queued logging
+    setup_logging(LOG_LEVEL, LOG_LEVELS, LOG_RING_SIZE, LOG_QUEUE_SIZE)
+
     # Start a persistent silent stream to keep Bluetooth speakers awake
-    logging.info("🔇 Starting silent background stream to keep speaker active...")
+    logger.info("🔇 Starting silent background stream to keep speaker active...")
     silence_proc = subprocess.Popen(
         ["ffplay", "-f", "lavfi", "-i", "anullsrc", "-nodisp", "-loglevel", "quiet"]
     )
@@ -43,8 +46,8 @@ def main():
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind((UDP_IP, UDP_PORT))
 
-    logging.info(f"👂 Beep listener started on {UDP_IP}:{UDP_PORT}")
-    logging.info(f"📂 Sound path: {SOUND_PATH}")
+    logger.info(f"👂 Beep listener started on {UDP_IP}:{UDP_PORT}")
+    logger.info(f"📂 Sound path: {SOUND_PATH}")
 
     try:
         while True:
@@ -54,9 +57,9 @@ def main():
             if message == "BEEP":
                 play_beep()
             else:
-                logging.warning(f"Received unknown message: {message}")
+                logger.warning(f"Received unknown message: {message}")
     except KeyboardInterrupt:
-        logging.info("Stopping beep listener...")
+        logger.info("Stopping beep listener...")
     finally:
         sock.close()
         silence_proc.terminate()
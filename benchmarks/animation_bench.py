@@ -0,0 +1,104 @@
+"""
+Benchmark of the LED animation engine render cost per frame.
+
+Usage (from the repository root):
+    python -m benchmarks.animation_bench [--pixels 24 144 600] [--fps 50 100 200]
+
+Renders every effect for a few seconds of animation time on strips of several
+sizes and reports the cost per frame, the share of the frame budget at each
+frame rate, and the time spent precomputing lookup tables. The pure Python
+per-pixel interpolation the idle animation used before is the baseline.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from led.animation import (
+    AnimationEngine,
+    Blink,
+    Breathe,
+    Chase,
+    ColorCycle,
+    Progress,
+    Solid,
+    Spinner,
+    pack,
+)
+
+COLORS = [(255, 255, 255), (0, 102, 204), (0, 168, 168)]
+
+
+def effects():
+    return {
+        "solid": Solid(COLORS[1]),
+        "blink": Blink(COLORS[1]),
+        "color_cycle": ColorCycle(COLORS),
+        "breathe": Breathe(COLORS[1]),
+        "spinner": Spinner(COLORS[1]),
+        "chase": Chase(COLORS[1]),
+        "progress": Progress(COLORS[1], duration=5.0),
+    }
+
+
+def python_interpolation(pixels, frames, transition=3.0):
+    """The previous idle animation: one interpolation, then a per-pixel loop."""
+    start = time.perf_counter()
+    for n in range(frames):
+        elapsed = (n * 0.02) % (transition * len(COLORS))
+        index = int(elapsed // transition)
+        progress = (elapsed % transition) / transition
+        a, b = COLORS[index], COLORS[(index + 1) % len(COLORS)]
+        color = tuple(int(a[c] + (b[c] - a[c]) * progress) for c in range(3))
+        packed = [(color[0] << 16) | (color[1] << 8) | color[2] for _ in range(pixels)]
+    del packed
+    return (time.perf_counter() - start) / frames
+
+
+def measure(effect, pixels, fps, frames, blend):
+    engine = AnimationEngine(pixels, fps, blend)
+    start = time.perf_counter()
+    effect.prepare(pixels, fps)
+    prepare = time.perf_counter() - start
+    engine.switch(effect, 0.0)
+
+    start = time.perf_counter()
+    for n in range(frames):
+        frame, _ = engine.render(n / fps)
+        # What the controller does with every frame before talking to the strip
+        pack(frame)
+    return prepare, (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="LED animation engine render cost per frame"
+    )
+    parser.add_argument("--pixels", type=int, nargs="+", default=[24, 144, 600])
+    parser.add_argument("--fps", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument(
+        "--blend", type=float, default=0.0, help="Crossfade at the start, in seconds"
+    )
+    args = parser.parse_args()
+
+    print(f"numpy {np.__version__}, {args.frames} frames per run")
+    for pixels in args.pixels:
+        print(f"\n{pixels} pixels")
+        baseline = python_interpolation(pixels, args.frames)
+        rows = [("python_loop", 0.0, baseline)]
+        for name, effect in effects().items():
+            # Lookup tables depend on the frame rate, measure at the highest
+            rows.append(
+                (name, *measure(effect, pixels, max(args.fps), args.frames, args.blend))
+            )
+
+        header = "".join(f"  {fps:>3} fps" for fps in args.fps)
+        print(f"{'effect':<12} {'us/frame':>9} {'prepare ms':>11}{header}")
+        for name, prepare, per_frame in rows:
+            budget = "".join(f"  {per_frame * fps * 100:>6.2f}%" for fps in args.fps)
+            print(f"{name:<12} {per_frame * 1e6:>9.1f} {prepare * 1000:>11.2f}{budget}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Probe of the capture modes a camera supports and their real throughput.
+
+Usage (from the repository root):
+    python -m benchmarks.camera_probe [camera_index] [--frames 60]
+
+Lists the modes reported by v4l2-ctl (if installed), then opens the camera in
+each FOURCC/resolution combination and measures the delivered frame rate.
+"""
+
+import argparse
+import shutil
+import subprocess
+import time
+
+import cv2
+from scanner_parts.sources import configure_camera, describe_camera, to_luma
+
+FOURCCS = ("MJPG", "YUYV")
+RESOLUTIONS = ((320, 240), (640, 480), (800, 600), (1280, 720), (1920, 1080))
+
+
+def list_v4l2_modes(index: int):
+    if not shutil.which("v4l2-ctl"):
+        return None
+    result = subprocess.run(
+        ["v4l2-ctl", "-d", f"/dev/video{index}", "--list-formats-ext"],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout
+
+
+def measure_mode(index, fourcc, width, height, frames, raw):
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        return None
+    configure_camera(cap, fourcc, width, height, fps=60, buffer_size=1, raw=raw)
+    actual = describe_camera(cap)
+
+    # Let exposure and the driver queue settle
+    for _ in range(5):
+        cap.read()
+
+    got = 0
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    for _ in range(frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if raw:
+            to_luma(frame)
+        got += 1
+    wall = time.perf_counter() - start_wall
+    cpu = time.process_time() - start_cpu
+    cap.release()
+
+    return actual, got / wall if wall else 0.0, cpu / got * 1000 if got else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Capture modes of a camera and their real throughput"
+    )
+    parser.add_argument("camera", nargs="?", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--raw", action="store_true", help="Measure the luma path")
+    args = parser.parse_args()
+
+    modes = list_v4l2_modes(args.camera)
+    if modes:
+        print(modes)
+
+    print(f"{'requested':<20} {'actual':<22} {'fps':>6} {'cpu ms/frame':>13}")
+    seen = set()
+    for fourcc in FOURCCS:
+        for width, height in RESOLUTIONS:
+            result = measure_mode(
+                args.camera, fourcc, width, height, args.frames, args.raw
+            )
+            if result is None:
+                raise SystemExit(f"Camera {args.camera} could not be opened")
+            actual, fps, cpu = result
+            # Drivers fall back to the nearest mode; skip repeats
+            if actual in seen:
+                continue
+            seen.add(actual)
+            print(
+                f"{fourcc} {width}x{height:<11} {actual:<22} {fps:>6.1f} {cpu:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark of the threaded and the asyncio network client against mock_server.py.
+
+Usage (from the repository root):
+    python -m benchmarks.client_bench [--url URL] [--requests 200] [--spawn]
+
+--spawn starts mock_server.py in a subprocess for the duration of the run.
+Both variants validate the same number of distinct codes concurrently; the
+threaded one the way send_scan used to (one thread per request) and the
+asyncio one on the client engine loop.
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from config import API_LISTEN_PORT
+
+
+def summarize(name, latencies, wall, peak_threads):
+    lat = sorted(latencies)
+    print(
+        f"{name:<9} {len(lat) / wall:>8.1f} req/s  "
+        f"p50 {statistics.median(lat) * 1000:>7.1f} ms  "
+        f"p95 {lat[int(len(lat) * 0.95) - 1] * 1000:>7.1f} ms  "
+        f"peak threads {peak_threads}"
+    )
+
+
+class ThreadSampler(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = threading.active_count()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.001)
+
+
+def run_threaded(client, url, count):
+    latencies = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        client.validate_qr(url, f"BENCH-THREAD-{i:06d}")
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    sampler = ThreadSampler()
+    sampler.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=one, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    sampler.running = False
+    return latencies, wall, sampler.peak
+
+
+def run_asyncio(client, url, count):
+    async def one(i):
+        start = time.perf_counter()
+        await client.validate_qr_async(url, f"BENCH-ASYNC-{i:06d}")
+        return time.perf_counter() - start
+
+    async def all_requests():
+        return await asyncio.gather(*(one(i) for i in range(count)))
+
+    sampler = ThreadSampler()
+    sampler.start()
+    start = time.perf_counter()
+    latencies = client.get_engine().submit(all_requests()).result()
+    wall = time.perf_counter() - start
+    sampler.running = False
+    return latencies, wall, sampler.peak
+
+
+def wait_for_server(client, url, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.validate_qr(url, "BENCH-WARMUP").outcome != client.CONNECTION_ERROR:
+            return
+        time.sleep(0.5)
+    raise SystemExit(f"Mock server at {url} did not come up")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Threaded versus asyncio network client against mock_server.py"
+    )
+    parser.add_argument(
+        "--url",
+        default=f"http://127.0.0.1:{API_LISTEN_PORT}/api/v1/orders/validate-qr",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--spawn", action="store_true")
+    args = parser.parse_args()
+
+    import logging
+
+    import client
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(
+            [sys.executable, "mock_server.py"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    try:
+        wait_for_server(client, args.url)
+        print(f"{args.requests} concurrent validations against {args.url}")
+        summarize("threaded", *run_threaded(client, args.url, args.requests))
+        summarize("asyncio", *run_asyncio(client, args.url, args.requests))
+    finally:
+        client.stop_engine()
+        if server is not None:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
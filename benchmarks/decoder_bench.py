@@ -0,0 +1,46 @@
+"""
+Benchmark of all available QR decoder backends over a corpus of recorded frames.
+
+Usage (from the repository root):
+    python -m benchmarks.decoder_bench [corpus_dir_or_video] [--limit 500]
+
+Without a corpus, synthetic frames are used.
+"""
+
+import argparse
+
+from scanner_parts.decoders import available_backends, load_corpus, measure
+from scanner_parts.synthetic import calibration_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="QR decoder backends over a corpus of recorded frames"
+    )
+    parser.add_argument("corpus", nargs="?", help="Image directory or video file")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--multi", action="store_true", help="Use decode_multi")
+    args = parser.parse_args()
+
+    if args.corpus:
+        frames = load_corpus(args.corpus, args.limit)
+    else:
+        frames = calibration_frames(count=min(args.limit, 50))
+    if not frames:
+        raise SystemExit("Corpus contains no readable frames")
+
+    print(f"Frames: {len(frames)}")
+    print(
+        f"{'backend':<10} {'success':>8} {'dec/s':>8} "
+        f"{'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for name, decoder in available_backends().items():
+        r = measure(decoder, frames, args.multi)
+        print(
+            f"{name:<10} {r['success_rate']:>8.1%} {r['decodes_per_s']:>8.1f} "
+            f"{r['mean_ms']:>8.2f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
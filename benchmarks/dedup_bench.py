@@ -0,0 +1,172 @@
+"""
+Micro-benchmark and memory test of the scan Deduplicator with millions of codes.
+
+Usage (from the repository root):
+    python -m benchmarks.dedup_bench [--codes 2000000] [--max-size 10000]
+
+Feeds distinct codes (plus a repeat of every tenth one) through the bounded
+Deduplicator and through the old grow-forever dict, on a simulated clock that
+advances --rate codes per second, and reports throughput and peak memory.
+Pass --threads to hammer one instance from several threads, and --store to
+also time the write-behind store and restoring a full window from it.
+"""
+
+import argparse
+import threading
+import time
+import tracemalloc
+
+from dedup import DedupStore, Deduplicator
+
+
+class UnboundedDeduplicator:
+    """The previous implementation: one dict entry per code, forever."""
+
+    def __init__(self, timeout, clock):
+        self.timeout = timeout
+        self.clock = clock
+        self.last_seen = {}
+        self.lock = threading.Lock()
+
+    def is_new(self, value):
+        with self.lock:
+            now = self.clock()
+            if value in self.last_seen:
+                if now - self.last_seen[value] < self.timeout:
+                    return False
+            self.last_seen[value] = now
+            return True
+
+
+class SimulatedClock:
+    """
+    Advances by one code interval per distinct code, whichever thread feeds
+    it, so the clock never runs backwards (the Deduplicator relies on
+    insertion order being expiry order) and the codes per simulated second
+    stay at --rate with any number of threads.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.ticks = 0
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def tick(self):
+        with self.lock:
+            self.now = self.ticks / self.rate
+            self.ticks += 1
+
+
+def feed(dedup, clock, codes, offset=0, step=1):
+    accepted = 0
+    for i in range(offset, codes, step):
+        clock.tick()
+        code = f"https://metimat.example/order/{i:012d}"
+        if dedup.is_new(code):
+            accepted += 1
+        # Same code still in front of the camera a frame later
+        if i % 10 == 0 and dedup.is_new(code):
+            accepted += 1
+    return accepted
+
+
+def timed(dedup, clock, args):
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    if args.threads > 1:
+        threads = [
+            threading.Thread(
+                target=feed,
+                args=(dedup, clock, args.codes, n, args.threads),
+            )
+            for n in range(args.threads)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        accepted = None
+    else:
+        accepted = feed(dedup, clock, args.codes)
+    return accepted, time.perf_counter() - start_wall, time.process_time() - start_cpu
+
+
+def run(name, factory, args):
+    # Timing and memory in separate passes, tracemalloc slows every allocation
+    clock = SimulatedClock(args.rate)
+    dedup = factory(clock)
+    accepted, wall, cpu = timed(dedup, clock, args)
+
+    clock = SimulatedClock(args.rate)
+    tracemalloc.start()
+    timed(factory(clock), clock, args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    calls = args.codes * 1.1
+    print(
+        f"{name:<10} {calls / wall / 1e6:>6.2f} M calls/s  "
+        f"{wall / calls * 1e9:>6.0f} ns/call  cpu {cpu:>6.2f} s  "
+        f"entries {len(dedup.last_seen):>9}  peak {peak / 1e6:>8.1f} MB"
+        + (f"  accepted {accepted}" if accepted is not None else "")
+    )
+
+
+def run_store(path, args):
+    store = DedupStore(path, flush_interval=3600)
+    dedup = Deduplicator(3600, args.max_size, store=store)
+    start = time.perf_counter()
+    for i in range(args.max_size):
+        dedup.is_new(f"https://metimat.example/order/{i:012d}")
+    record = time.perf_counter() - start
+    start = time.perf_counter()
+    store.flush()
+    flush = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restored = Deduplicator(3600, args.max_size, store=DedupStore(path))
+    restore = time.perf_counter() - start
+    print(
+        f"store      {record / args.max_size * 1e9:>6.0f} ns/call with store  "
+        f"flush {flush * 1000:.1f} ms  "
+        f"restore {len(restored)} entries in {restore * 1000:.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deduplicator speed and memory with millions of codes"
+    )
+    parser.add_argument("--codes", type=int, default=2_000_000)
+    parser.add_argument("--max-size", type=int, default=10000)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument(
+        "--rate", type=float, default=100.0, help="Distinct codes per simulated second"
+    )
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--store", help="SQLite file for the store benchmark")
+    parser.add_argument(
+        "--skip-unbounded", action="store_true", help="Only run the bounded variant"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.codes} distinct codes, timeout {args.timeout} s, "
+        f"{args.rate:.0f} codes/s, {args.threads} thread(s)"
+    )
+    run(
+        "bounded",
+        lambda clock: Deduplicator(args.timeout, args.max_size, clock),
+        args,
+    )
+    if not args.skip_unbounded:
+        run("unbounded", lambda clock: UnboundedDeduplicator(args.timeout, clock), args)
+    if args.store:
+        run_store(args.store, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark of LEDController frame timing, blink accuracy and CPU use.
+
+Usage (from the repository root):
+    python -m benchmarks.led_bench [--seconds 5] [--commands 50]
+
+Runs the controller against the recording SimulatedStrip, so it works on any
+Linux machine. Reports the jitter of idle animation frames against IDLE_FPS,
+the measured blink period against 2 * BLINK_INTERVAL, the CPU share of the
+process in each state, and the latency from a command to its first frame.
+"""
+
+import argparse
+import statistics
+import time
+
+from led.constants import COLOR_GREEN, COLOR_RED, COLOR_YELLOW, IDLE_FPS
+from led.controller import BLINK_INTERVAL, LEDController
+from led.strip import SimulatedStrip
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def observe(controller, seconds):
+    """Returns the frames recorded and the CPU share during the next `seconds`."""
+    strip = controller.strip
+    first = strip.shows
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    time.sleep(seconds)
+    cpu = (time.process_time() - start_cpu) / (time.perf_counter() - start_wall)
+    count = strip.shows - first
+    return list(strip.frames)[-count:] if count else [], cpu
+
+
+def report_idle(frames, cpu):
+    expected = 1 / IDLE_FPS
+    intervals = [b[0] - a[0] for a, b in zip(frames, frames[1:])]
+    # Frames identical to the previous one are not pushed, so intervals are
+    # multiples of the frame time; jitter is the distance to the nearest one
+    slots = [max(1, round(i / expected)) for i in intervals]
+    jitter = [abs(i - n * expected) * 1000 for i, n in zip(intervals, slots)]
+    print(
+        f"idle    {len(frames)} frames, {sum(slots) - len(slots)} unchanged skipped  "
+        f"jitter mean {statistics.mean(jitter):.3f} ms  "
+        f"p99 {percentile(jitter, 0.99):.3f} ms  max {max(jitter):.3f} ms  "
+        f"cpu {cpu * 100:.2f}%"
+    )
+
+
+def report_blink(frames, cpu, color):
+    # Start of every fully lit phase; blended frames are neither on nor off
+    on_starts, lit = [], None
+    for t, pixels in frames:
+        if all(p == color for p in pixels):
+            state = True
+        elif not any(pixels):
+            state = False
+        else:
+            continue
+        if state and lit is False:
+            on_starts.append(t)
+        lit = state
+    periods = [(b - a) * 1000 for a, b in zip(on_starts, on_starts[1:])]
+    if not periods:
+        print("blink   not enough periods, increase --seconds")
+        return
+    expected = 2 * BLINK_INTERVAL * 1000
+    errors = [abs(p - expected) for p in periods]
+    print(
+        f"blink   {len(periods)} periods  "
+        f"mean {statistics.mean(periods):.2f} ms (target {expected:.0f})  "
+        f"error mean {statistics.mean(errors):.3f} ms  max {max(errors):.3f} ms  "
+        f"cpu {cpu * 100:.2f}%"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="LEDController frame timing, blink accuracy and CPU use"
+    )
+    parser.add_argument("--seconds", type=float, default=5.0, help="Per state")
+    parser.add_argument("--commands", type=int, default=50)
+    args = parser.parse_args()
+
+    controller = LEDController(backend="simulated")
+    assert isinstance(controller.strip, SimulatedStrip)
+    controller.start()
+    controller.set_idle()
+    time.sleep(0.5)
+
+    report_idle(*observe(controller, args.seconds))
+
+    controller.set_blink(COLOR_YELLOW, duration=args.seconds + 1)
+    report_blink(*observe(controller, args.seconds), COLOR_YELLOW)
+
+    controller.set_color(COLOR_RED)
+    time.sleep(0.5)
+    frames, cpu = observe(controller, args.seconds)
+    print(f"solid   {len(frames)} frames pushed while static  cpu {cpu * 100:.2f}%")
+
+    # Fresh controller so only these commands count; alternate the colour so
+    # every command changes the strip
+    controller = LEDController(backend="simulated")
+    controller.start()
+    for n in range(args.commands):
+        controller.set_color(COLOR_GREEN if n % 2 else COLOR_RED)
+        time.sleep(0.02)
+    time.sleep(0.1)
+    metrics = controller.metrics()
+    print(
+        f"latency {args.commands} commands  "
+        f"mean {metrics['latency_mean_ms']:.3f} ms  "
+        f"max {metrics['latency_max_ms']:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
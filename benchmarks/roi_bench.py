@@ -0,0 +1,91 @@
+"""
+Benchmark of full-frame versus ROI-tracked QR decoding on recorded footage.
+
+Usage (from the repository root):
+    python -m benchmarks.roi_bench recording.mp4 [--padding 0.5] [--scale 1.0]
+"""
+
+import argparse
+import time
+
+import cv2
+from scanner_parts.tracking import RoiTracker
+
+
+def load_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run_full(frames):
+    detector = cv2.QRCodeDetector()
+    decoded = 0
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    for frame in frames:
+        data, _, _ = detector.detectAndDecode(frame)
+        if data:
+            decoded += 1
+    return decoded, time.perf_counter() - start_wall, time.process_time() - start_cpu
+
+
+def run_roi(frames, padding, scale, max_misses):
+    detector = cv2.QRCodeDetector()
+    tracker = RoiTracker(padding, scale, max_misses)
+    decoded = 0
+    roi_frames = 0
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    for frame in frames:
+        roi = tracker.region(frame)
+        if not roi.is_full_frame:
+            roi_frames += 1
+        data, bbox, _ = detector.detectAndDecode(roi.image)
+        tracker.update(roi, bbox)
+        if data:
+            decoded += 1
+    wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    return decoded, wall, cpu, roi_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Full-frame versus ROI-tracked QR decoding on recorded footage"
+    )
+    parser.add_argument("video", help="Recorded footage (any format OpenCV reads)")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--padding", type=float, default=0.5)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--max-misses", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.limit)
+    if not frames:
+        raise SystemExit(f"No frames could be read from {args.video}")
+
+    n = len(frames)
+    full_ok, full_wall, full_cpu = run_full(frames)
+    roi_ok, roi_wall, roi_cpu, roi_frames = run_roi(
+        frames, args.padding, args.scale, args.max_misses
+    )
+
+    print(f"Frames: {n}")
+    print(
+        f"Full frame: {full_ok} decoded, {full_wall / n * 1000:.2f} ms/frame, "
+        f"{full_cpu / n * 1000:.2f} ms CPU/frame"
+    )
+    print(
+        f"ROI:        {roi_ok} decoded, {roi_wall / n * 1000:.2f} ms/frame, "
+        f"{roi_cpu / n * 1000:.2f} ms CPU/frame ({roi_frames} cropped frames)"
+    )
+    if roi_cpu > 0:
+        print(f"CPU speedup: {full_cpu / roi_cpu:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Reproducible benchmark of the scanning path (scan_camera + deduplication).
+
+Usage (from the repository root):
+    python -m benchmarks.scanner_bench [source] [--fast] [--codes 10] [--sheet]
+
+`source` is anything scan_camera accepts (default: a synthetic QR stream).
+With --sheet a second code joins every synthetic code a few frames later, as
+when a sheet with several prescriptions is slid under the camera; both have
+to be decoded.
+Reports decode fps, time from a code's first appearance to its first decode
+and CPU time per frame.
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+
+from config import DUPLICATE_TIMEOUT
+from dedup import Deduplicator
+from scanner import scan_camera
+from scanner_parts.capture import ScannerStats
+from scanner_parts.sources import SyntheticSource, open_source
+from scanner_parts.synthetic import encode_qr
+
+
+class SheetSource(SyntheticSource):
+    """SyntheticSource where a second code appears `late` frames after each code."""
+
+    def __init__(self, codes, late: int = 6, **kwargs):
+        super().__init__(codes, **kwargs)
+        self.late = late
+        self.partners = [f"{code}-B" for code in self.codes]
+        self.partner_images = [
+            cv2.cvtColor(encode_qr(code, 5), cv2.COLOR_GRAY2BGR)
+            for code in self.partners
+        ]
+
+    def read(self):
+        ok, frame = super().read()
+        if frame is None:
+            return ok, frame
+
+        code_index, offset = divmod(self.index - 1, self.gap + self.hold)
+        if offset >= self.gap + self.late:
+            qr = self.partner_images[code_index]
+            qh, qw = qr.shape[:2]
+            frame[10 : 10 + qh, 10 : 10 + qw] = qr
+            self.first_shown.setdefault(self.partners[code_index], time.monotonic())
+        return True, frame
+
+
+def run(source, realtime: bool):
+    stats = ScannerStats()
+    dedup = Deduplicator(DUPLICATE_TIMEOUT)
+    ground_truth = getattr(source, "first_shown", None)
+
+    frames = 0
+    first_decode = {}
+    start_wall, start_cpu = time.monotonic(), time.process_time()
+
+    for codes, _ in scan_camera(source, stats, realtime=realtime):
+        frames += 1
+        for data in codes:
+            if dedup.is_new(data):
+                first_decode.setdefault(data, time.monotonic())
+
+    wall = time.monotonic() - start_wall
+    cpu = time.process_time() - start_cpu
+
+    if ground_truth is not None:
+        latencies = [
+            (first_decode[code] - shown) * 1000
+            for code, shown in ground_truth.items()
+            if code in first_decode
+        ]
+        expected = len(ground_truth)
+    else:
+        latencies = [(t - start_wall) * 1000 for t in first_decode.values()]
+        expected = None
+
+    return {
+        "frames": frames,
+        "wall": wall,
+        "cpu": cpu,
+        "codes": len(first_decode),
+        "expected": expected,
+        "latencies": latencies,
+        "stats": stats.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scanning path benchmark (scan_camera + deduplication)"
+    )
+    parser.add_argument("source", nargs="?", default="synthetic")
+    parser.add_argument("--fast", action="store_true", help="Do not pace replay")
+    parser.add_argument("--codes", type=int, default=10, help="Synthetic codes")
+    parser.add_argument(
+        "--sheet", action="store_true", help="Add a late second code to each code"
+    )
+    args = parser.parse_args()
+
+    realtime = not args.fast
+    if args.source == "synthetic":
+        codes = [f"METIMAT-SYNTH-{i:04d}" for i in range(args.codes)]
+        if args.sheet:
+            source = SheetSource(codes, realtime=realtime)
+        else:
+            source = SyntheticSource(codes, realtime=realtime)
+    else:
+        source = open_source(args.source, realtime)
+
+    r = run(source, realtime)
+    stats = r["stats"]
+    frames = max(r["frames"], 1)
+
+    print(f"Frames yielded:  {r['frames']} in {r['wall']:.2f} s")
+    print(f"Pipeline:        {stats}")
+    print(f"Decode fps:      {stats.get('decoded', 0) / r['wall']:.1f}")
+    print(f"CPU per frame:   {r['cpu'] / frames * 1000:.2f} ms")
+    found = f"{r['codes']}" + (f"/{r['expected']}" if r["expected"] else "")
+    print(f"Codes decoded:   {found}")
+    if r["latencies"]:
+        label = "First decode" if r["expected"] else "Since start"
+        lat = sorted(r["latencies"])
+        print(
+            f"{label} (ms):   mean {statistics.mean(lat):.1f}, "
+            f"median {statistics.median(lat):.1f}, max {lat[-1]:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,143 @@
+import asyncio
 import logging
 import socket
 import threading
 
+import aiohttp
 import requests
-from config import MACHINE_ACCESS_TOKEN
+from client_parts.aio import AsyncEngine
+from client_parts.breaker import CircuitBreaker
+from client_parts.cache import ValidationCache
+from client_parts.executor import ScanExecutor, when_all
+from client_parts.health import HealthProbe
+from client_parts.outbox import CompletionOutbox
+from client_parts.session import create_session
+from config import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    CACHE_SIZE,
+    CACHE_TTL_ERROR,
+    CACHE_TTL_INVALID,
+    CLIENT_ENGINE,
+    HEALTH_DOWN_INTERVAL,
+    HEALTH_FAILURE_THRESHOLD,
+    HEALTH_PROBE_INTERVAL,
+    HEALTH_PROBE_URL,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_READ_TIMEOUT,
+    MACHINE_ACCESS_TOKEN,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_PATH,
+    OUTBOX_RETRY_BASE,
+    OUTBOX_RETRY_MAX,
+    SCAN_DEADLINE,
+    SCAN_QUEUE_SIZE,
+    SCAN_WORKERS,
+)
 from gui_parts.constants import gui_signals
-from led.constants import COLOR_GREEN, COLOR_RED, COLOR_YELLOW
+from led.animation import Spinner, to_rgb
+from led.constants import (
+    COLOR_GREEN,
+    COLOR_LOGO_BLUE,
+    COLOR_RED,
+    COLOR_YELLOW,
+    PRIORITY_SUCCESS,
+)
 from led.controller import LEDController
+from tracing import tracer
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # UDP Settings for beep listener
 UDP_IP = "127.0.0.1"
 UDP_PORT = 5005
 
+HEADERS = {
+    "X-Machine-Token": MACHINE_ACCESS_TOKEN,
+    "Content-Type": "application/json",
+}
+
+# One pooled keep-alive session shared by all requests, so consecutive scans
+# and completion calls reuse the TCP/TLS connection
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+session = create_session(
+    headers=HEADERS,
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+)
+
+# Bounded pool for validation requests; identical codes in flight are coalesced
+scan_executor = ScanExecutor(SCAN_WORKERS, SCAN_QUEUE_SIZE)
+
+# Event loop engine used instead of the worker pool with CLIENT_ENGINE=asyncio;
+# created on first use, so the threaded client never starts a loop
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncEngine(
+                HEADERS, HTTP_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+            )
+        return _engine
+
+
+def stop_engine():
+    """Closes the aiohttp session and the loop thread if the engine was used."""
+    global _engine
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.stop()
+
+
+# Outcomes of a validation request
+VALID = "valid"
+INVALID = "invalid"
+UNAUTHORIZED = "unauthorized"
+SERVER_ERROR = "server_error"
+CONNECTION_ERROR = "connection_error"
+UNEXPECTED_ERROR = "unexpected_error"
+# Never sent: the local scan queue was full
+BUSY = "busy"
+
+
+class ValidationResult:
+    """Outcome of validating one QR code against the backend."""
+
+    def __init__(
+        self,
+        qr_data: str,
+        outcome: str,
+        order=None,
+        message: str = "",
+        status_code=None,
+    ):
+        self.qr_data = qr_data
+        self.outcome = outcome
+        self.order = order or {}
+        self.message = message
+        self.status_code = status_code
+
+    @property
+    def valid(self) -> bool:
+        return self.outcome == VALID
+
+
+# Recent validation results; spares the round trip for rescans and foreign codes.
+# Valid results are never cached: dispensing uses the code up
+validation_cache = ValidationCache(
+    CACHE_SIZE,
+    ttls={VALID: 0, INVALID: CACHE_TTL_INVALID},
+    default_ttl=CACHE_TTL_ERROR,
+)
+
 
 def play_beep():
     """
@@ -23,111 +147,438 @@ def play_beep():
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.sendto(b"BEEP", (UDP_IP, UDP_PORT))
         sock.close()
-        logging.info("🔊 UDP BEEP signal sent")
+        logger.info("🔊 UDP BEEP signal sent")
     except Exception as e:
-        logging.error(f"❌ Failed to send UDP BEEP: {e}")
+        logger.error(f"❌ Failed to send UDP BEEP: {e}")
+
+
+def post_completion(url: str, order_id) -> int:
+    """
+    Sends a request to mark the order as completed. Returns the HTTP status,
+    network errors are raised to the outbox.
+    """
+    logger.info(f"📤 Completing order #{order_id}...")
+    response = session.post(completion_url(url, order_id), timeout=HTTP_TIMEOUT)
+    log_completion(order_id, response.status_code)
+    return response.status_code
+
+
+def post_completion_batch(url: str, order_ids):
+    """
+    Marks several orders as completed in one request.
+    Returns (status, ids of the completed orders).
+    """
+    base_url = url.rsplit("/", 1)[0]
+    logger.info(f"📤 Completing {len(order_ids)} orders in one batch...")
+    response = session.post(
+        f"{base_url}/complete-batch",
+        json={"order_ids": [int(i) if str(i).isdigit() else i for i in order_ids]},
+        timeout=HTTP_TIMEOUT,
+    )
+    if response.status_code != 200:
+        return response.status_code, []
+    completed = response.json().get("completed", [])
+    logger.info(f"✅ {len(completed)}/{len(order_ids)} orders marked as completed.")
+    return 200, completed
+
+
+# Completions are journaled first and sent by a background flusher, so they
+# survive network outages and restarts
+outbox = CompletionOutbox(
+    OUTBOX_PATH,
+    post_completion,
+    post_completion_batch,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_RETRY_BASE,
+    OUTBOX_RETRY_MAX,
+    OUTBOX_MAX_ATTEMPTS,
+)
+
+
+# Opens after repeated backend failures so scans fail locally and instantly;
+# its state is shown in the GUI
+breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN)
+breaker.add_listener(gui_signals.backend_state.emit)
+
+
+def record_outcome(result: ValidationResult):
+    """Feeds the outcome of a backend round trip into the circuit breaker."""
+    if result.outcome == CONNECTION_ERROR or (
+        result.outcome == SERVER_ERROR and (result.status_code or 0) >= 500
+    ):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def probe_backend():
+    """
+    Lightweight request through the same connection pool as the scans. Any
+    HTTP status below 500 proves the backend is reachable and leaves a warm
+    connection. The outcome also feeds the circuit breaker, so a successful
+    probe closes an open circuit before the cooldown is over.
+    """
+    try:
+        if CLIENT_ENGINE == "asyncio":
+            engine = get_engine()
+            status = engine.submit(engine.head(HEALTH_PROBE_URL)).result()
+        else:
+            status = session.head(HEALTH_PROBE_URL, timeout=HTTP_TIMEOUT).status_code
+    except Exception:
+        breaker.record_failure()
+        raise
+
+    if status >= 500:
+        breaker.record_failure()
+        raise RuntimeError(f"Backend answered {status}")
+    breaker.record_success()
+    return status
+
+
+# Started by main.py: warms the connection at boot and keeps it alive
+health_probe = HealthProbe(
+    probe_backend,
+    HEALTH_PROBE_INTERVAL,
+    HEALTH_DOWN_INTERVAL,
+    HEALTH_FAILURE_THRESHOLD,
+)
+health_probe.on_recovered(outbox.wake)
+
+
+def backend_down(qr_data: str):
+    """
+    Returns a connection error right away while the circuit is open, instead
+    of letting the customer wait for the timeout.
+    """
+    if not breaker.allow():
+        logger.warning(f"⚡ Backend circuit open, failing fast for: {qr_data}")
+        health_probe.probe_now()
+        return ValidationResult(qr_data, CONNECTION_ERROR)
+    return None
 
 
 def complete_order(url: str, order_id: int):
     """
-    Sends a request to mark the order as completed after dispensing.
+    Marks the order as completed after dispensing. The call is journaled in
+    the outbox and sent in the background; it never blocks on the network.
+    """
+    outbox.add(url, order_id)
+
+
+async def complete_order_async(url: str, order_id: int):
     """
+    Async equivalent of complete_order, runs on the client engine loop.
+    """
+    await get_engine().call_back(outbox.add, url, order_id)
+
+
+def completion_url(url: str, order_id) -> str:
     base_url = url.rsplit("/", 1)[0]
-    complete_url = f"{base_url}/{order_id}/complete"
+    return f"{base_url}/{order_id}/complete"
+
+
+def log_completion(order_id, status_code: int) -> bool:
+    if status_code == 200:
+        logger.info(f"✅ Order #{order_id} successfully marked as completed.")
+        return True
+    logger.error(f"❌ Failed to complete order #{order_id}: {status_code}")
+    return False
+
+
+def validate_qr(url: str, qr_data: str) -> ValidationResult:
+    """
+    Sends QR data to the validate-qr endpoint with machine authentication and
+    classifies the ValidationResponse. Does not touch LEDs or GUI.
+    """
+    cached = cached_validation(qr_data) or backend_down(qr_data)
+    if cached is not None:
+        return cached
+
+    payload = {"qr_data": qr_data}
+
+    try:
+        logger.info(f"📤 Sending validation request for: {qr_data}")
+        tracer.mark(qr_data, "http_start")
+        response = session.post(url, json=payload, timeout=HTTP_TIMEOUT)
+        tracer.mark(qr_data, "http_done")
+        result = parse_validation(qr_data, response.status_code, response)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        logger.error("❌ Connection error or timeout.")
+        health_probe.probe_now()
+        result = ValidationResult(qr_data, CONNECTION_ERROR)
+    except Exception as e:
+        logger.error(f"❌ POST failed: {e}")
+        result = ValidationResult(qr_data, UNEXPECTED_ERROR)
+
+    record_outcome(result)
+    validation_cache.put(result)
+    return result
 
-    headers = {
-        "X-Machine-Token": MACHINE_ACCESS_TOKEN,
-        "Content-Type": "application/json",
-    }
+
+async def validate_qr_async(url: str, qr_data: str) -> ValidationResult:
+    """
+    Async equivalent of validate_qr, runs on the client engine loop.
+    """
+    cached = cached_validation(qr_data) or backend_down(qr_data)
+    if cached is not None:
+        return cached
 
     try:
-        logging.info(f"📤 Completing order #{order_id}...")
-        response = requests.post(complete_url, headers=headers, timeout=5)
+        logger.info(f"📤 Sending validation request for: {qr_data}")
+        tracer.mark(qr_data, "http_start")
+        response = await get_engine().post(url, {"qr_data": qr_data})
+        tracer.mark(qr_data, "http_done")
+        result = parse_validation(qr_data, response.status_code, response)
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+        logger.error("❌ Connection error or timeout.")
+        health_probe.probe_now()
+        result = ValidationResult(qr_data, CONNECTION_ERROR)
+    except asyncio.CancelledError:
+        # Cut off by SCAN_DEADLINE: still counts against the backend, else a
+        # half-open breaker would wait for its trial request forever
+        record_outcome(ValidationResult(qr_data, CONNECTION_ERROR))
+        raise
+    except Exception as e:
+        logger.error(f"❌ POST failed: {e}")
+        result = ValidationResult(qr_data, UNEXPECTED_ERROR)
 
-        if response.status_code == 200:
-            logging.info(f"✅ Order #{order_id} successfully marked as completed.")
-        else:
-            logging.error(
-                f"❌ Failed to complete order #{order_id}: {response.status_code}"
+    record_outcome(result)
+    validation_cache.put(result)
+    return result
+
+
+def cached_validation(qr_data: str):
+    result = validation_cache.get(qr_data)
+    if result is not None:
+        logger.info(f"💾 Cached validation for {qr_data}: {result.outcome}")
+    return result
+
+
+def parse_validation(qr_data: str, status_code: int, response) -> ValidationResult:
+    """
+    Turns an HTTP response of validate-qr into a ValidationResult. `response`
+    only needs .json() and .text.
+    """
+    if status_code == 200:
+        data = response.json()
+        if data.get("valid"):
+            order = data.get("order", {})
+            logger.info(f"✅ QR valid! Order #{order.get('id', 'Unknown')} confirmed.")
+            # Lazy %-formatting: the payload is only serialized with debug logging on
+            logger.debug("Validation response: %s", data)
+            return ValidationResult(qr_data, VALID, order=order, status_code=200)
+
+        message = data.get("message", "Ungültiger Code")
+        logger.warning(f"❌ QR invalid: {qr_data} – {message}")
+        return ValidationResult(qr_data, INVALID, message=message, status_code=200)
+
+    if status_code == 401:
+        logger.error("❌ Machine authentication failed (401).")
+        return ValidationResult(qr_data, UNAUTHORIZED, status_code=401)
+
+    logger.error(f"❌ API Error {status_code}: {response.text}")
+    return ValidationResult(qr_data, SERVER_ERROR, status_code=status_code)
+
+
+def merge_orders(orders):
+    """Combines several orders into one order dict for the success page."""
+    if len(orders) == 1:
+        return orders[0]
+
+    merged = {"ids": [o.get("id") for o in orders]}
+    for key in ("prescriptions", "medication_items", "items"):
+        merged[key] = [item for o in orders for item in (o.get(key) or [])]
+    return merged
+
+
+def unique_orders(results):
+    """
+    Orders of the valid results. Several codes of the same order (e.g. one
+    sheet with several prescriptions) yield it only once.
+    """
+    orders = {}
+    for result in results:
+        if result.valid:
+            orders.setdefault(result.order.get("id", result.qr_data), result.order)
+    return list(orders.values())
+
+
+def show_results(results, led_controller: LEDController):
+    """
+    Updates LEDs and GUI for the results of one scan batch. A batch counts as
+    success if at least one code was valid. Returns the orders to dispense,
+    each order once.
+    """
+    orders = unique_orders(results)
+    payloads = [r.qr_data for r in results]
+    if orders:
+        for order in orders:
+            prescriptions = order.get("prescriptions", [])
+            medication_items = order.get("medication_items", [])
+
+            med_names = [p.get("medication_name", "Unknown") for p in prescriptions]
+            for item in medication_items:
+                med = item.get("medication", {})
+                name = med.get("name", "Unknown")
+                qty = item.get("quantity", 1)
+                med_names.append(f"{name} (x{qty})")
+
+            logger.info(
+                f"📦 Items to dispense for order #{order.get('id', 'Unknown')}: "
+                f"{', '.join(med_names)}"
             )
+
+        # Successful scan: Green LED and Success GUI
+        led_controller.set_color(COLOR_GREEN, timeout=10.0, priority=PRIORITY_SUCCESS)
+        tracer.displaying(payloads)
+        gui_signals.show_success.emit(merge_orders(orders))
+        return orders
+
+    result = results[0]
+    if result.outcome == INVALID:
+        # Invalid code: Red LED and Error GUI
+        led_controller.set_color(COLOR_RED, timeout=10.0)
+        message = result.message
+    elif result.outcome == UNAUTHORIZED:
+        led_controller.set_color(COLOR_RED, timeout=3.0)
+        message = "Zugriff verweigert (401)"
+    elif result.outcome == SERVER_ERROR:
+        led_controller.set_color(COLOR_RED, timeout=3.0)
+        message = f"Serverfehler: {result.status_code}"
+    elif result.outcome == CONNECTION_ERROR:
+        # Connection issue: Yellow blink LED and Error GUI
+        led_controller.set_blink(COLOR_YELLOW, duration=3.0)
+        message = "Verbindung zum Server fehlgeschlagen"
+    elif result.outcome == BUSY:
+        led_controller.set_blink(COLOR_YELLOW, duration=3.0)
+        message = "Gerät ausgelastet, bitte erneut scannen"
+    else:
+        led_controller.set_blink(COLOR_YELLOW, duration=3.0)
+        message = "Ein unerwarteter Fehler ist aufgetreten"
+
+    tracer.displaying(payloads)
+    gui_signals.show_error.emit(message)
+    return []
+
+
+def report_results(url: str, results, led_controller: LEDController):
+    """
+    Shows the results of one scan batch and completes the valid orders.
+    """
+    orders = show_results(results, led_controller)
+    if orders:
+        # Simulate dispensing logic
+        logger.info("⚙️ Dispensing medication...")
+        for order in orders:
+            complete_order(url, order.get("id", "Unknown"))
+
+
+async def send_scan_async(url: str, qr_data, led_controller: LEDController):
+    """
+    Async equivalent of send_scan. Validates the batch concurrently, shows the
+    result through the engine's callback thread and completes valid orders.
+    Validation is cut off after SCAN_DEADLINE and reported as a connection
+    error, so the customer always gets a result.
+    """
+    engine = get_engine()
+    codes = [qr_data] if isinstance(qr_data, str) else list(qr_data)
+    tasks = {}
+    for code in codes:
+        task, is_new = engine.coalesce(code, lambda c=code: validate_qr_async(url, c))
+        if is_new:
+            tasks[task] = code
+
+    if not tasks:
+        return []
+    await engine.call_back(play_beep)
+
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*tasks), SCAN_DEADLINE)
+    except asyncio.TimeoutError:
+        logger.error(f"❌ Scan missed the {SCAN_DEADLINE:.0f} s deadline: {codes}")
+        results = [ValidationResult(code, CONNECTION_ERROR) for code in tasks.values()]
+    try:
+        orders = await engine.call_back(show_results, results, led_controller)
     except Exception as e:
-        logging.error(f"❌ Completion request failed: {e}")
+        logger.error(f"❌ Reporting scan result failed: {e}")
+        return results
+
+    if orders:
+        logger.info("⚙️ Dispensing medication...")
+        await asyncio.gather(
+            *(complete_order_async(url, o.get("id", "Unknown")) for o in orders)
+        )
+    return results
+
+
+# Shared so its frames are only precomputed once
+waiting_effect = Spinner(to_rgb(COLOR_LOGO_BLUE))
+
+
+def show_waiting(led_controller: LEDController):
+    """
+    Spins until the result preempts it. The spinner has a lower priority than
+    any result, so one that arrives first is never replaced by it.
+    """
+    led_controller.set_effect(waiting_effect, SCAN_DEADLINE, follow_up=False)
+
+
+def log_failure(future):
+    """Done callback of send_scan_async: errors would otherwise vanish."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"❌ Scan failed: {future.exception()!r}")
 
 
-def send_scan(url: str, qr_data: str, led_controller: LEDController):
+def send_scan(url: str, qr_data, led_controller: LEDController):
     """
-    Sends QR data to the validate-qr endpoint with machine authentication.
-    Handles the ValidationResponse containing order details and updates LEDs and GUI.
+    Validates one QR code or a batch of codes decoded from the same frame and
+    updates LEDs and GUI once for the whole batch. Codes whose validation is
+    still in flight are not sent again; the pending request reports for them.
+    Returns the codes that were rejected because the scan queue was full, so
+    the caller can let them be scanned again.
     """
+    codes = [qr_data] if isinstance(qr_data, str) else list(qr_data)
+    logger.info(f"🔍 send_scan called for data: {', '.join(codes)}")
 
-    def post():
-        logging.info(f"🔍 send_scan called for data: {qr_data}")
-        play_beep()
+    if CLIENT_ENGINE == "asyncio":
+        future = get_engine().submit(send_scan_async(url, codes, led_controller))
+        future.add_done_callback(log_failure)
+        show_waiting(led_controller)
+        return []
 
-        payload = {"qr_data": qr_data}
-        headers = {
-            "X-Machine-Token": MACHINE_ACCESS_TOKEN,
-            "Content-Type": "application/json",
-        }
+    submitted = {}
+    rejected = []
+    for code in codes:
+        future, is_new = scan_executor.submit(code, validate_qr, url, code)
+        if future is None:
+            rejected.append(code)
+        elif is_new:
+            submitted[future] = code
 
+    if not submitted:
+        if rejected:
+            # Nothing of this frame is pending: tell the customer right away.
+            # Local overload, so it bypasses the breaker and the cache
+            show_results(
+                [ValidationResult(code, BUSY) for code in rejected], led_controller
+            )
+        return rejected
+    show_waiting(led_controller)
+    play_beep()
+
+    def report(futures):
+        results = [
+            (
+                f.result()
+                if f.exception() is None
+                else ValidationResult(submitted[f], UNEXPECTED_ERROR)
+            )
+            for f in futures
+        ]
         try:
-            logging.info(f"📤 Sending validation request for: {qr_data}")
-            response = requests.post(url, json=payload, headers=headers, timeout=5)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("valid"):
-                    order = data.get("order", {})
-                    order_id = order.get("id", "Unknown")
-
-                    prescriptions = order.get("prescriptions", [])
-                    medication_items = order.get("medication_items", [])
-
-                    med_names = [
-                        p.get("medication_name", "Unknown") for p in prescriptions
-                    ]
-                    for item in medication_items:
-                        med = item.get("medication", {})
-                        name = med.get("name", "Unknown")
-                        qty = item.get("quantity", 1)
-                        med_names.append(f"{name} (x{qty})")
-
-                    logging.info(f"✅ QR valid! Order #{order_id} confirmed.")
-                    logging.info(f"📦 Items to dispense: {', '.join(med_names)}")
-
-                    logging.info(data)
-
-                    # Successful scan: Green LED and Success GUI
-                    led_controller.set_color(COLOR_GREEN, timeout=10.0)
-                    gui_signals.show_success.emit(order)
-
-                    # Simulate dispensing logic
-                    logging.info("⚙️ Dispensing medication...")
-                    complete_order(url, order_id)
-                else:
-                    # Invalid code: Red LED and Error GUI
-                    message = data.get("message", "Ungültiger Code")
-                    logging.warning(f"❌ QR invalid: {qr_data} – {message}")
-                    led_controller.set_color(COLOR_RED, timeout=10.0)
-                    gui_signals.show_error.emit(message)
-
-            elif response.status_code == 401:
-                logging.error("❌ Machine authentication failed (401).")
-                led_controller.set_color(COLOR_RED, timeout=3.0)
-                gui_signals.show_error.emit("Zugriff verweigert (401)")
-            else:
-                logging.error(f"❌ API Error {response.status_code}: {response.text}")
-                led_controller.set_color(COLOR_RED, timeout=3.0)
-                gui_signals.show_error.emit(f"Serverfehler: {response.status_code}")
-
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
-            # Connection issue: Yellow blink LED and Error GUI
-            logging.error("❌ Connection error or timeout.")
-            led_controller.set_blink(COLOR_YELLOW, duration=3.0)
-            gui_signals.show_error.emit("Verbindung zum Server fehlgeschlagen")
+            report_results(url, results, led_controller)
         except Exception as e:
-            logging.error(f"❌ POST failed: {e}")
-            led_controller.set_blink(COLOR_YELLOW, duration=3.0)
-            gui_signals.show_error.emit("Ein unerwarteter Fehler ist aufgetreten")
+            logger.error(f"❌ Reporting scan result failed: {e}")
 
-    threading.Thread(target=post, daemon=True).start()
+    when_all(list(submitted), report)
+    return rejected
@@ -0,0 +1,120 @@
+"""
+asyncio networking core running on one dedicated event loop thread
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+
+class BufferedResponse:
+    """Fully read HTTP response with the parts of the requests API we use."""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncEngine:
+    """
+    Owns an event loop in a background thread and one aiohttp session with a
+    bounded connection pool. Coroutines are handed over with submit() from any
+    thread and can be cancelled through the returned Future or by a deadline.
+    Blocking callbacks (LEDs, GUI) run on a separate single callback thread,
+    so they never stall the loop and never run concurrently with each other.
+    """
+
+    def __init__(
+        self,
+        headers=None,
+        limit: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 5.0,
+    ):
+        self.headers = headers or {}
+        self.limit = limit
+        # connect also covers DNS and waiting for a free pooled connection,
+        # total caps the whole request like the requests (connect, read) pair
+        self.timeout = aiohttp.ClientTimeout(
+            total=connect_timeout + read_timeout,
+            connect=connect_timeout,
+            sock_connect=connect_timeout,
+            sock_read=read_timeout,
+        )
+        self.loop = asyncio.new_event_loop()
+        self.callbacks = ThreadPoolExecutor(1, thread_name_prefix="aio-callback")
+        self.inflight = {}
+        self._session = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self.loop.run_forever, name="aio-client", daemon=True
+                )
+                self._thread.start()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Must be created on the loop thread
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                headers=self.headers, connector=connector, timeout=self.timeout
+            )
+        return self._session
+
+    async def post(self, url: str, payload=None) -> BufferedResponse:
+        async with self._get_session().post(url, json=payload) as response:
+            return BufferedResponse(response.status, await response.text())
+
+    async def head(self, url: str) -> int:
+        async with self._get_session().head(url) as response:
+            return response.status
+
+    def submit(self, coro, deadline=None):
+        """
+        Schedules `coro` on the loop from any thread. With `deadline` (seconds)
+        it is cancelled when it takes longer. Returns a concurrent Future.
+        """
+        self.start()
+        if deadline:
+            coro = asyncio.wait_for(coro, deadline)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def coalesce(self, key, factory):
+        """
+        Returns (task, is_new) for the request identified by `key`. While a
+        request with that key is running, its task is shared instead of
+        calling `factory()` again. Only call on the loop thread.
+        """
+        task = self.inflight.get(key)
+        if task is not None:
+            return task, False
+
+        task = self.loop.create_task(factory())
+        self.inflight[key] = task
+        task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return task, True
+
+    async def call_back(self, fn, *args):
+        """Runs a blocking callback on the callback thread and awaits it."""
+        return await self.loop.run_in_executor(self.callbacks, fn, *args)
+
+    def stop(self):
+        async def close():
+            if self._session is not None:
+                await self._session.close()
+
+        if self._thread is not None:
+            asyncio.run_coroutine_threadsafe(close(), self.loop).result(5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(5)
+        self.callbacks.shutdown(wait=False)
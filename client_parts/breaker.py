@@ -0,0 +1,128 @@
+"""
+Circuit breaker for the validation backend
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Counts backend failures in a row. At `failure_threshold` the circuit opens
+    and allow() refuses requests, so callers can fail locally instead of
+    waiting for timeouts. After `cooldown` seconds it turns half-open and lets
+    `half_open_max` trial requests through: a success closes it again, a
+    failure re-opens it for another cooldown. Listeners are called with the
+    new state on every transition, from the thread that caused it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 15.0,
+        half_open_max: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.half_open_max = half_open_max
+        self.listeners = []
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._since = time.monotonic()
+
+        self.opens = 0
+        self.rejected = 0
+        self.state_seconds = {CLOSED: 0.0, OPEN: 0.0, HALF_OPEN: 0.0}
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _transition(self, state: str):
+        """Must be called with the lock held; returns the listeners to notify."""
+        if state == self._state:
+            return []
+        now = time.monotonic()
+        self.state_seconds[self._state] += now - self._since
+        self._since = now
+        self._state = state
+        if state == OPEN:
+            self.opens += 1
+            self._opened_at = now
+        self._trials = 0
+        return list(self.listeners)
+
+    def _notify(self, listeners, state: str):
+        if listeners:
+            logger.warning(f"🔌 Backend circuit {state}")
+        for callback in listeners:
+            try:
+                callback(state)
+            except Exception as e:
+                logger.error(f"❌ Circuit listener failed: {e}")
+
+    def allow(self) -> bool:
+        """True if a request may be sent now."""
+        with self._lock:
+            listeners = []
+            if (
+                self._state == OPEN
+                and time.monotonic() - self._opened_at >= self.cooldown
+            ):
+                listeners = self._transition(HALF_OPEN)
+
+            if self._state == CLOSED:
+                allowed = True
+            elif self._state == HALF_OPEN and self._trials < self.half_open_max:
+                self._trials += 1
+                allowed = True
+            else:
+                self.rejected += 1
+                allowed = False
+            state = self._state
+        self._notify(listeners, state)
+        return allowed
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            listeners = self._transition(CLOSED)
+        self._notify(listeners, CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            listeners = []
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                listeners = self._transition(OPEN)
+            state = self._state
+        self._notify(listeners, state)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            seconds = dict(self.state_seconds)
+            seconds[self._state] += time.monotonic() - self._since
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opens": self.opens,
+                "rejected": self.rejected,
+                "state_seconds": seconds,
+            }
@@ -0,0 +1,70 @@
+"""
+Size-bounded TTL/LRU cache of validation results
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ValidationCache:
+    """
+    Keeps recent ValidationResults per QR payload. The TTL depends on the
+    outcome (`ttls` maps outcome -> seconds, `default_ttl` covers the rest);
+    a TTL of 0 disables caching for that outcome. When full, the least
+    recently used entry is evicted.
+    """
+
+    def __init__(self, max_size: int = 256, ttls=None, default_ttl: float = 5.0):
+        self.max_size = max_size
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # qr_data -> (expires_at, result)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hits_by_outcome = {}
+
+    def get(self, qr_data: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(qr_data)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[qr_data]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(qr_data)
+            result = entry[1]
+            self.hits += 1
+            self.hits_by_outcome[result.outcome] = (
+                self.hits_by_outcome.get(result.outcome, 0) + 1
+            )
+            return result
+
+    def put(self, result):
+        ttl = self.ttls.get(result.outcome, self.default_ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[result.qr_data] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(result.qr_data)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "hits_by_outcome": dict(self.hits_by_outcome),
+            }
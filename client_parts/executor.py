@@ -0,0 +1,113 @@
+"""
+Bounded worker pool with coalescing of identical in-flight requests
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class ScanExecutor:
+    """
+    Runs jobs on a fixed number of worker threads fed by a bounded queue.
+    A job submitted under a key that is still queued or running is not run
+    again; the caller gets the pending Future instead. When the queue is full
+    the job is rejected (backpressure) and submit returns None.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 8, name: str = "scan"):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.inflight = {}
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+        for i in range(workers):
+            threading.Thread(
+                target=self._worker, name=f"{name}-worker-{i}", daemon=True
+            ).start()
+
+    def submit(self, key, fn, *args):
+        """
+        Returns (future, is_new). is_new is False if the future belongs to an
+        identical request that was already pending. future is None if the
+        queue was full.
+        """
+        with self._lock:
+            pending = self.inflight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                return pending, False
+
+            future = Future()
+            try:
+                self.queue.put_nowait((key, future, fn, args, time.monotonic()))
+            except queue.Full:
+                self.rejected += 1
+                logger.warning(f"⚠️ Scan queue full, dropping request for {key}")
+                return None, False
+
+            self.inflight[key] = future
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+            return future, True
+
+    def _worker(self):
+        while True:
+            key, future, fn, args, queued_at = self.queue.get()
+            waited = time.monotonic() - queued_at
+            with self._lock:
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self.inflight.pop(key, None)
+                    self.completed += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "max_queue_depth": self.max_depth,
+                "in_flight": len(self.inflight),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "wait_avg_ms": (
+                    self.wait_total / self.completed * 1000 if self.completed else 0.0
+                ),
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+def when_all(futures, callback):
+    """Calls callback(futures) once, after every future has finished."""
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback(futures)
+
+    for future in futures:
+        future.add_done_callback(done)
@@ -0,0 +1,107 @@
+"""
+Connection pre-warming and background health probing of the backend
+"""
+
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProbe(threading.Thread):
+    """
+    Calls `probe()` right after start (so DNS, TCP and TLS are done before the
+    first scan) and then every `interval` seconds, which also keeps the pooled
+    connection from idling out. `probe` raises when the backend cannot be
+    reached or is failing. After `failure_threshold` failed probes in a row
+    the backend is considered unreachable and probed every `down_interval`
+    seconds until it answers again. This only steers probing and logging;
+    failing scans fast is up to the caller (client.py's circuit breaker).
+    """
+
+    def __init__(
+        self,
+        probe,
+        interval: float = 20.0,
+        down_interval: float = 5.0,
+        failure_threshold: int = 2,
+        history: int = 180,
+    ):
+        super().__init__(name="health-probe", daemon=True)
+        self.probe = probe
+        self.interval = interval
+        self.down_interval = down_interval
+        self.failure_threshold = failure_threshold
+        self.rtts = deque(maxlen=history)  # (wall clock time, rtt in ms)
+        self.reachable = None  # unknown until the first probe
+        self.failures = 0
+        self.recovery_callbacks = []
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def on_recovered(self, callback):
+        """Registers a callback for the moment the backend answers again."""
+        self.recovery_callbacks.append(callback)
+
+    def is_unreachable(self) -> bool:
+        return self.reachable is False
+
+    def probe_now(self):
+        """Asks for an immediate probe, e.g. after a failing request."""
+        self._wake.set()
+
+    def probe_once(self) -> bool:
+        start = time.perf_counter()
+        try:
+            self.probe()
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                went_down = (
+                    self.failures >= self.failure_threshold
+                    and self.reachable is not False
+                )
+                if self.failures >= self.failure_threshold:
+                    self.reachable = False
+            if went_down:
+                logger.error(f"❌ Backend unreachable: {e}")
+            return False
+
+        rtt = (time.perf_counter() - start) * 1000
+        with self._lock:
+            recovered = self.reachable is False
+            self.reachable = True
+            self.failures = 0
+            self.rtts.append((time.time(), rtt))
+
+        if recovered:
+            logger.info(f"✅ Backend reachable again ({rtt:.0f} ms)")
+            for callback in self.recovery_callbacks:
+                callback()
+        return True
+
+    def run(self):
+        while True:
+            self.probe_once()
+            interval = self.down_interval if self.is_unreachable() else self.interval
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            rtts = [rtt for _, rtt in self.rtts]
+            return {
+                "reachable": self.reachable,
+                "consecutive_failures": self.failures,
+                "rtt_last_ms": rtts[-1] if rtts else None,
+                "rtt_median_ms": statistics.median(rtts) if rtts else None,
+                "rtt_max_ms": max(rtts) if rtts else None,
+            }
+
+    def rtt_history(self):
+        """Returns [(wall clock time, rtt ms), ...] of the recent probes."""
+        with self._lock:
+            return list(self.rtts)
@@ -0,0 +1,248 @@
+"""
+Durable outbox for order completion calls
+"""
+
+import logging
+import random
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses after which retrying a completion cannot help
+PERMANENT_FAILURES = {400, 404, 409, 410, 422}
+# A bad machine token is a config problem: retried without counting attempts
+AUTH_FAILURES = {401, 403}
+
+# What became of a single completion call
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+REFUSED = "refused"
+
+
+class CompletionOutbox:
+    """
+    Journals every order completion in SQLite before it is sent, so nothing is
+    lost when the network or the process goes down. A background flusher sends
+    the oldest entries, in batches when several are waiting, and retries with
+    exponential backoff. Entries are only removed once the backend accepted
+    (or permanently rejected) them, or after the backend refused them
+    `max_attempts` times.
+
+    `send_one(url, order_id)` returns the HTTP status and raises on network
+    errors. `send_batch(url, order_ids)` returns (status, completed_ids).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        send_one,
+        send_batch=None,
+        batch_size: int = 20,
+        retry_base: float = 1.0,
+        retry_max: float = 300.0,
+        max_attempts: int = 50,
+    ):
+        self.send_one = send_one
+        self.send_batch = send_batch
+        self.batch_size = batch_size
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # FULL fsyncs the WAL on every commit: an accepted entry survives power loss
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "url TEXT NOT NULL, "
+            "order_id TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.commit()
+
+        self.failures = 0
+        self.sent = 0
+        self.rejected = 0
+        self.abandoned = 0
+        self.batches = 0
+        self.sends = 0
+        self.send_seconds = 0.0
+
+        # Replay whatever is left over from before a restart
+        self._wake.set()
+        self._thread = threading.Thread(
+            target=self._run, name="completion-outbox", daemon=True
+        )
+        self._thread.start()
+
+    def add(self, url: str, order_id):
+        """Journals a completion and wakes the flusher."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO completions (url, order_id, created_at) VALUES (?, ?, ?)",
+                (url, str(order_id), time.time()),
+            )
+            self._db.commit()
+        self._wake.set()
+
+    def wake(self):
+        """Retries right away, e.g. after the backend became reachable again."""
+        self.failures = 0
+        self._wake.set()
+
+    def backlog(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def _next_batch(self):
+        with self._lock:
+            stale = self._db.execute(
+                "SELECT id, order_id, attempts FROM completions WHERE attempts >= ?",
+                (self.max_attempts,),
+            ).fetchall()
+            for row_id, order_id, attempts in stale:
+                logger.error(
+                    f"❌ Giving up on completion of order #{order_id} "
+                    f"after {attempts} refused attempts"
+                )
+            if stale:
+                self._db.executemany(
+                    "DELETE FROM completions WHERE id = ?", [(r[0],) for r in stale]
+                )
+                self._db.commit()
+                self.abandoned += len(stale)
+
+            first = self._db.execute(
+                "SELECT url FROM completions ORDER BY id LIMIT 1"
+            ).fetchone()
+            if first is None:
+                return None, []
+            rows = self._db.execute(
+                "SELECT id, order_id FROM completions WHERE url = ? ORDER BY id LIMIT ?",
+                (first[0], self.batch_size),
+            ).fetchall()
+            return first[0], rows
+
+    def _finish(self, done_ids, refused_ids):
+        with self._lock:
+            self._db.executemany(
+                "DELETE FROM completions WHERE id = ?", [(i,) for i in done_ids]
+            )
+            self._db.executemany(
+                "UPDATE completions SET attempts = attempts + 1 WHERE id = ?",
+                [(i,) for i in refused_ids],
+            )
+            self._db.commit()
+
+    def _send_one(self, url, order_id):
+        """
+        Returns ACCEPTED, REJECTED (for good), REFUSED (for now) or None on
+        auth failures.
+        """
+        status = self.send_one(url, order_id)
+        if status in PERMANENT_FAILURES:
+            logger.error(f"❌ Completion of order #{order_id} rejected: {status}")
+            return REJECTED
+        if status in AUTH_FAILURES:
+            logger.error(f"❌ Completion of order #{order_id} not authorized: {status}")
+            return None
+        return ACCEPTED if status == 200 else REFUSED
+
+    def _send(self, url, rows):
+        """
+        Returns the row ids the backend accepted, rejected for good and
+        refused for now. Raises if the backend is unreachable.
+        """
+        if len(rows) > 1 and self.send_batch is not None:
+            status, completed = self.send_batch(url, [order_id for _, order_id in rows])
+            if status == 200:
+                completed = {str(c) for c in completed}
+                self.batches += 1
+                done = [row_id for row_id, order_id in rows if order_id in completed]
+                return done, [], [row_id for row_id, _ in rows if row_id not in done]
+            if status in (404, 405, 501):
+                logger.warning("⚠️ Backend has no batch completion, sending singly")
+                self.send_batch = None
+            elif status in PERMANENT_FAILURES:
+                # One bad entry spoils the batch; sending singly isolates it
+                logger.warning(
+                    f"⚠️ Completion batch rejected ({status}), sending singly"
+                )
+                outcomes = {ACCEPTED: [], REJECTED: [], REFUSED: []}
+                for row_id, order_id in rows:
+                    outcome = self._send_one(url, order_id)
+                    if outcome is not None:
+                        outcomes[outcome].append(row_id)
+                return outcomes[ACCEPTED], outcomes[REJECTED], outcomes[REFUSED]
+            elif status in AUTH_FAILURES:
+                logger.error(f"❌ Completion batch not authorized: {status}")
+                return [], [], []
+            else:
+                return [], [], [row_id for row_id, _ in rows]
+
+        row_id, order_id = rows[0]
+        outcome = self._send_one(url, order_id)
+        return (
+            [row_id] if outcome == ACCEPTED else [],
+            [row_id] if outcome == REJECTED else [],
+            [row_id] if outcome == REFUSED else [],
+        )
+
+    def flush(self) -> bool:
+        """Sends one batch. Returns False if nothing could be sent."""
+        url, rows = self._next_batch()
+        if not rows:
+            return False
+
+        start = time.perf_counter()
+        try:
+            accepted, rejected, refused = self._send(url, rows)
+        except Exception as e:
+            logger.error(f"❌ Completion replay failed: {e}")
+            # Unreachable backend: waiting is all we can do, it is no attempt
+            accepted, rejected, refused = [], [], []
+        self.send_seconds += time.perf_counter() - start
+        self.sends += 1
+
+        # Rejected entries can never succeed, they leave the journal as well
+        self._finish(accepted + rejected, refused)
+        self.sent += len(accepted)
+        self.rejected += len(rejected)
+        return bool(accepted or rejected)
+
+    def _run(self):
+        while True:
+            if self.failures:
+                delay = min(self.retry_max, self.retry_base * 2 ** (self.failures - 1))
+                self._wake.wait(delay * random.uniform(0.5, 1.0))
+            else:
+                self._wake.wait()
+            self._wake.clear()
+
+            while True:
+                if self.flush():
+                    self.failures = 0
+                    continue
+                if self.backlog():
+                    self.failures += 1
+                break
+
+    def metrics(self) -> dict:
+        return {
+            "backlog": self.backlog(),
+            "sent": self.sent,
+            "rejected": self.rejected,
+            "abandoned": self.abandoned,
+            "batches": self.batches,
+            "consecutive_failures": self.failures,
+            "mean_send_ms": (
+                self.send_seconds / self.sends * 1000 if self.sends else 0.0
+            ),
+        }
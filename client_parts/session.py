@@ -0,0 +1,123 @@
+"""
+Shared, pooled HTTP session for all backend calls
+"""
+
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, List, Tuple, Union, cast
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+if TYPE_CHECKING:
+    # Protocols that only exist for type checkers
+    from urllib3._base_connection import BaseHTTPConnection, BaseHTTPSConnection
+
+# TCP keep-alive so idle pooled connections survive NAT/firewall timeouts, on
+# top of urllib3's default TCP_NODELAY
+KEEPALIVE_SOCKET_OPTIONS: List[Tuple[int, int, Union[int, bytes]]] = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+
+class ConnectionMetrics:
+    """Counts requests versus newly opened connections and their setup time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.handshake_total = 0.0
+        self.handshake_max = 0.0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self, seconds: float):
+        with self._lock:
+            self.connections += 1
+            self.handshake_total += seconds
+            self.handshake_max = max(self.handshake_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.connections, 0)
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+                "handshake_avg_ms": (
+                    self.handshake_total / self.connections * 1000
+                    if self.connections
+                    else 0.0
+                ),
+                "handshake_max_ms": self.handshake_max * 1000,
+            }
+
+
+# Global metrics instance
+connection_metrics = ConnectionMetrics()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        connection_metrics.record_connect(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # Includes DNS, TCP connect and the TLS handshake
+        start = time.perf_counter()
+        super().connect()
+        connection_metrics.record_connect(time.perf_counter() - start)
+
+
+# urllib3 declares ConnectionCls against its connection protocols
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = cast("type[BaseHTTPConnection]", _TimedHTTPConnection)
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = cast("type[BaseHTTPSConnection]", _TimedHTTPSConnection)
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with keep-alive sockets and connection setup metrics."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        connection_metrics.record_request()
+        return super().send(request, *args, **kwargs)
+
+
+def create_session(
+    headers=None, pool_connections: int = 2, pool_maxsize: int = 4
+) -> requests.Session:
+    """
+    Builds a session whose connections are kept open and reused by all
+    threads. `pool_connections` is the number of hosts to keep pools for,
+    `pool_maxsize` the number of open connections per host.
+    """
+    session = requests.Session()
+    adapter = PooledAdapter(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
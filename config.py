@@ -31,9 +31,132 @@ API_LISTEN_PORT = int(os.getenv("API_LISTEN_PORT", "8001"))
 protocol = "https" if API_USE_SSL else "http"
 API_URL = f"{protocol}://{API_HOST}:{API_PORT}/{API_PATH.lstrip('/')}"
 
+# HTTP Client Settings
+# Pooled keep-alive connections: hosts to keep pools for / connections per host
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "2"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "4"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "5"))
+# Validation worker threads and the number of scans that may wait for one
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "2"))
+SCAN_QUEUE_SIZE = int(os.getenv("SCAN_QUEUE_SIZE", "8"))
+# "threaded" (worker pool + requests) or "asyncio" (one event loop thread + aiohttp)
+CLIENT_ENGINE = os.getenv("CLIENT_ENGINE", "threaded").lower()
+# Seconds after which the validation of an asyncio scan is cancelled and
+# reported as a connection error
+SCAN_DEADLINE = float(os.getenv("SCAN_DEADLINE", "15"))
+
+# Backend Health Probe (warms the connection at boot and keeps it alive)
+HEALTH_PROBE_URL = os.getenv("HEALTH_PROBE_URL") or API_URL
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "20"))
+# Probe interval while the backend is unreachable
+HEALTH_DOWN_INTERVAL = float(os.getenv("HEALTH_DOWN_INTERVAL", "5"))
+# Failed probes in a row before switching to HEALTH_DOWN_INTERVAL and logging
+# the outage (scans fail fast through the circuit breaker, see BREAKER_*)
+HEALTH_FAILURE_THRESHOLD = int(os.getenv("HEALTH_FAILURE_THRESHOLD", "2"))
+
+# Circuit Breaker (failures in a row before scans fail fast, seconds until retry)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "15"))
+
+# Validation Result Cache (entries and TTL in seconds per outcome; valid
+# results are never cached)
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", "256"))
+CACHE_TTL_INVALID = float(os.getenv("CACHE_TTL_INVALID", "120"))
+CACHE_TTL_ERROR = float(os.getenv("CACHE_TTL_ERROR", "5"))
+
+# Order Completion Outbox (SQLite journal replayed in the background)
+# Relative paths are resolved against the firmware directory
+OUTBOX_PATH = str(base_path / os.getenv("OUTBOX_PATH", "outbox.sqlite3"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+# Exponential backoff between replay attempts (seconds)
+OUTBOX_RETRY_BASE = float(os.getenv("OUTBOX_RETRY_BASE", "1"))
+OUTBOX_RETRY_MAX = float(os.getenv("OUTBOX_RETRY_MAX", "300"))
+# Dropped after the backend refused it this often (network errors do not count)
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "50"))
+
+# Logging (records are queued and written by a background thread)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Per-subsystem levels, e.g. "client=DEBUG,scanner_parts=WARNING,beep_listener=INFO"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# Recent records kept in memory, and records that may wait for the writer
+LOG_RING_SIZE = int(os.getenv("LOG_RING_SIZE", "1000"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Scan Latency Tracing (capture -> decode -> dedup -> HTTP -> LED -> GUI)
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "False").lower() == "true"
+TRACE_MAX_TRACES = int(os.getenv("TRACE_MAX_TRACES", "500"))
+# Histograms and recent traces are written here with every stats interval
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
 # Hardware & Timeout Settings
+# LED strip: auto (hardware if available), hardware or simulated
+LED_BACKEND = os.getenv("LED_BACKEND", "auto")
 DUPLICATE_TIMEOUT = int(os.getenv("DUPLICATE_TIMEOUT", "5"))
-CAMERA_ID = int(os.getenv("CAMERA_ID", "0"))
+DEDUP_MAX_SIZE = int(os.getenv("DEDUP_MAX_SIZE", "10000"))
+# Recent scans survive restarts here; written at most every DEDUP_FLUSH_INTERVAL s
+DEDUP_STORE_PATH = str(base_path / os.getenv("DEDUP_STORE_PATH", "dedup.sqlite3"))
+DEDUP_FLUSH_INTERVAL = float(os.getenv("DEDUP_FLUSH_INTERVAL", "1"))
+# Camera index, or a video file / image directory / "synthetic" for replay.
+# Several cameras are separated by commas, e.g. CAMERA_ID=0,2
+CAMERA_IDS = [
+    int(c) if c.isdigit() else c
+    for c in (c.strip() for c in os.getenv("CAMERA_ID", "0").split(","))
+    if c
+]
+if not CAMERA_IDS:
+    raise ValueError("CAMERA_ID must name at least one camera, e.g. CAMERA_ID=0")
+
+# Camera capture format (0 / empty keeps the driver default).
+# MJPG usually allows higher frame rates over USB than uncompressed YUYV.
+CAMERA_FOURCC = os.getenv("CAMERA_FOURCC", "")
+CAMERA_WIDTH = int(os.getenv("CAMERA_WIDTH", "0"))
+CAMERA_HEIGHT = int(os.getenv("CAMERA_HEIGHT", "0"))
+CAMERA_FPS = float(os.getenv("CAMERA_FPS", "0"))
+# A buffer of 1 keeps the driver from queueing stale frames
+CAMERA_BUFFER_SIZE = int(os.getenv("CAMERA_BUFFER_SIZE", "1"))
+# Decode on the raw luma plane instead of converted BGR frames (grayscale preview)
+CAMERA_GRAYSCALE = os.getenv("CAMERA_GRAYSCALE", "False").lower() == "true"
+
+# Camera Preview (GUI thumbnail size in pixels and refresh rate)
+PREVIEW_WIDTH = int(os.getenv("PREVIEW_WIDTH", "120"))
+PREVIEW_HEIGHT = int(os.getenv("PREVIEW_HEIGHT", "160"))
+PREVIEW_FPS = float(os.getenv("PREVIEW_FPS", "10"))
+# Index into CAMERA_ID of the camera shown first (tap the preview to switch)
+PREVIEW_CAMERA = int(os.getenv("PREVIEW_CAMERA", "0"))
+# Seconds between scanner statistics log lines (0 disables them)
+SCANNER_STATS_INTERVAL = float(os.getenv("SCANNER_STATS_INTERVAL", "60"))
+
+# Scanner Settings
+# QR decoder backend: opencv, pyzbar, wechat or auto (calibrated on startup)
+QR_DECODER = os.getenv("QR_DECODER", "auto")
+# Optional directory with recorded frames for the auto calibration run
+QR_CALIBRATION_DIR = os.getenv("QR_CALIBRATION_DIR", "")
+# Decode every code in a frame (e.g. a sheet of e-prescriptions) instead of one
+QR_MULTI = os.getenv("QR_MULTI", "True").lower() == "true"
+# Padding around the last QR bounding box (fraction of its size) and decode scale of the crop
+ROI_PADDING = float(os.getenv("ROI_PADDING", "0.5"))
+ROI_SCALE = float(os.getenv("ROI_SCALE", "1.0"))
+# Frames without a detection before falling back to a full-frame search
+ROI_MAX_MISSES = int(os.getenv("ROI_MAX_MISSES", "5"))
+# With QR_MULTI every n-th tracked frame is searched in full for codes joining
+# the tracked ones (0 disables it)
+ROI_FULL_INTERVAL = int(os.getenv("ROI_FULL_INTERVAL", "10"))
+# Gray-level change (0-255) of a 10x10 px block (at 640x480) that counts as
+# changed; 0 decodes every frame
+MOTION_THRESHOLD = float(os.getenv("MOTION_THRESHOLD", "12"))
+# Fraction of changed blocks that counts as motion
+MOTION_AREA = float(os.getenv("MOTION_AREA", "0.005"))
+# Seconds the decoder keeps running after motion or a detection
+MOTION_HOLD = float(os.getenv("MOTION_HOLD", "2.0"))
+# Seconds between probe decodes of a static scene (0 disables them)
+MOTION_IDLE_INTERVAL = float(os.getenv("MOTION_IDLE_INTERVAL", "1.0"))
+# Seconds without motion or a detection before the camera drops to idle capture
+# settings (0 disables the governor, as does MOTION_THRESHOLD=0)
+GOVERNOR_IDLE_AFTER = float(os.getenv("GOVERNOR_IDLE_AFTER", "30"))
+GOVERNOR_IDLE_WIDTH = int(os.getenv("GOVERNOR_IDLE_WIDTH", "320"))
+GOVERNOR_IDLE_HEIGHT = int(os.getenv("GOVERNOR_IDLE_HEIGHT", "240"))
+GOVERNOR_IDLE_FPS = float(os.getenv("GOVERNOR_IDLE_FPS", "5"))
 
 # Secrets
 # This key must match the 'validation_key' for this location in the backend database
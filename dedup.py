@@ -2,20 +2,178 @@
 Class to deduplicate URLs
 """
 
+import logging
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class DedupStore:
+    """
+    Keeps the recent dedup entries in SQLite so the window survives a crash
+    or reboot. Entries are stored with their wall clock expiry, since the
+    monotonic clock restarts with the system. Writes are collected in memory
+    and committed by a background thread at most every `flush_interval`
+    seconds, so a steady stream of scans costs one small transaction per
+    interval instead of one per code.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self._pending = {}
+        # _lock only guards _pending, so scanner threads never wait for a
+        # commit; _db_lock serializes the SQLite access
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Losing the last interval on power loss is acceptable, an fsync per
+        # flush is not worth the SD card wear
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "value TEXT PRIMARY KEY, "
+            "expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        self.flushes = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="dedup-store", daemon=True
+        )
+        self._thread.start()
+
+    def load(self, limit: int):
+        """Returns up to `limit` unexpired (value, wall clock expiry), oldest first."""
+        with self._db_lock:
+            self._db.execute("DELETE FROM seen WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT value, expires_at FROM seen ORDER BY expires_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def record(self, value, expires_at: float):
+        """Queues an entry for the next flush."""
+        with self._lock:
+            self._pending[value] = expires_at
+        self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._db_lock:
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO seen (value, expires_at) VALUES (?, ?)",
+                    pending.items(),
+                )
+                self._db.execute(
+                    "DELETE FROM seen WHERE expires_at <= ?", (time.time(),)
+                )
+                self._db.commit()
+            except sqlite3.Error:
+                self._db.rollback()
+                # Retry with the next flush unless a newer entry replaced it
+                with self._lock:
+                    for value, expires_at in pending.items():
+                        self._pending.setdefault(value, expires_at)
+                raise
+            self.flushes += 1
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Collect everything that arrives within one interval
+            time.sleep(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"❌ Dedup store flush failed: {e}")
 
 
 class Deduplicator:
-    def __init__(self, timeout):
+    """
+    Remembers each value for `timeout` seconds on a monotonic clock. Entries
+    are kept in expiry order (all share the same timeout, so that is insertion
+    order), which makes dropping expired ones and evicting the oldest at
+    `max_size` O(1) per entry. With a `store`, the window is restored at
+    startup and every new entry is written behind.
+    """
+
+    def __init__(self, timeout, max_size=10000, clock=time.monotonic, store=None):
         self.timeout = timeout
-        self.last_seen = {}
+        self.max_size = max_size
+        self.clock = clock
+        # value -> expiry, oldest first
+        self.last_seen = OrderedDict()
+        self.expired = 0
+        self.evicted = 0
+        # Shared by all camera threads
+        self.lock = threading.Lock()
+        self.store = store
+        if store is not None:
+            self._restore(store)
+
+    def _restore(self, store: DedupStore):
+        now, wall_now = self.clock(), time.time()
+        for value, expires_at in store.load(self.max_size):
+            # The Pi has no RTC: right after boot the wall clock may lag, so
+            # never restore more than one timeout of remaining window
+            remaining = min(expires_at - wall_now, self.timeout)
+            self.last_seen[value] = now + remaining
+        if self.last_seen:
+            logger.info(f"🔁 Restored {len(self.last_seen)} recent scans")
 
     def is_new(self, value):
-        now = time.time()
+        with self.lock:
+            now = self.clock()
+            self._expire(now)
 
-        if value in self.last_seen:
-            if now - self.last_seen[value] < self.timeout:
+            if value in self.last_seen:
                 return False
 
-        self.last_seen[value] = now
-        return True
+            self.last_seen[value] = now + self.timeout
+            if self.store is not None:
+                self.store.record(value, time.time() + self.timeout)
+            if len(self.last_seen) > self.max_size:
+                self.last_seen.popitem(last=False)
+                self.evicted += 1
+            return True
+
+    def forget(self, value):
+        """Lets `value` count as new again, e.g. when it could not be sent."""
+        with self.lock:
+            if self.last_seen.pop(value, None) is not None and self.store is not None:
+                # Already expired, dropped from the file on the next flush
+                self.store.record(value, 0)
+
+    def _expire(self, now):
+        entries = self.last_seen
+        while entries:
+            value, expiry = next(iter(entries.items()))
+            if expiry > now:
+                break
+            del entries[value]
+            self.expired += 1
+
+    def __len__(self):
+        return len(self.last_seen)
+
+    def metrics(self) -> dict:
+        with self.lock:
+            return {
+                "size": len(self.last_seen),
+                "max_size": self.max_size,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
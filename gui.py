@@ -8,16 +8,17 @@ from gui_parts.constants import (
     ERROR_COLOR,
     SURFACE_COLOR,
     TEXT_COLOR,
+    WARNING_COLOR,
     MachineSignals,
     gui_signals,
 )
-from gui_parts.widgets import WaveWidget
+from gui_parts.preview import preview_selection
+from gui_parts.widgets import ClickableFrame, WaveWidget
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QColor, QFont, QPixmap
 from PyQt6.QtSvgWidgets import QSvgWidget
 from PyQt6.QtWidgets import (
     QApplication,
-    QFrame,
     QHeaderView,
     QLabel,
     QMainWindow,
@@ -28,6 +29,7 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
+from tracing import tracer
 
 
 class MachineGUI(QMainWindow):
@@ -90,7 +92,7 @@ class MachineGUI(QMainWindow):
         self.close_btn.clicked.connect(self.close)
 
         # Camera Overlay (Smaller, portrait 3:4 aspect, bottom left corner)
-        self.camera_container = QFrame(self.central_widget)
+        self.camera_container = ClickableFrame(self.central_widget)
         self.camera_container.setStyleSheet("background-color: black; border: none;")
         cam_layout = QVBoxLayout(self.camera_container)
         cam_layout.setContentsMargins(0, 0, 0, 0)
@@ -98,6 +100,16 @@ class MachineGUI(QMainWindow):
         self.camera_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.camera_label.setStyleSheet("background: black; border: none;")
         cam_layout.addWidget(self.camera_label)
+        # Tapping the preview switches to the next camera
+        self.camera_container.clicked.connect(preview_selection.cycle)
+
+        # Backend Status (Top Center, only visible while the circuit is not closed)
+        self.backend_label = QLabel("", self.central_widget)
+        self.backend_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.backend_label.setStyleSheet(
+            f"background: {SURFACE_COLOR}; color: {WARNING_COLOR}; border-radius: 12px; font-size: 20px;"
+        )
+        self.backend_label.hide()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -113,6 +125,7 @@ class MachineGUI(QMainWindow):
         # Position Overlays
         self.logo_widget.setGeometry(30, 30, 80, 80)
         self.close_btn.setGeometry(w - 90, 30, 60, 60)
+        self.backend_label.setGeometry((w - 420) // 2, 40, 420, 50)
 
         # Reposition Camera to absolute bottom-left corner, portrait
         cam_w, cam_h = 120, 160
@@ -122,6 +135,7 @@ class MachineGUI(QMainWindow):
         self.waves.lower()
         self.logo_widget.raise_()
         self.close_btn.raise_()
+        self.backend_label.raise_()
         self.camera_container.raise_()
 
     def _create_idle_page(self):
@@ -213,15 +227,18 @@ class MachineGUI(QMainWindow):
         self.signals.show_success.connect(self.display_success)
         self.signals.show_error.connect(self.display_error)
         self.signals.update_frame.connect(self.set_camera_frame)
+        self.signals.backend_state.connect(self.display_backend_state)
 
     def set_camera_frame(self, image):
-        self.camera_label.setPixmap(
-            QPixmap.fromImage(image).scaled(
+        pixmap = QPixmap.fromImage(image)
+        # Previews are rendered at label size; only rescale if the label changed
+        if pixmap.size() != self.camera_label.size():
+            pixmap = pixmap.scaled(
                 self.camera_label.size(),
                 Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                Qt.TransformationMode.SmoothTransformation,
+                Qt.TransformationMode.FastTransformation,
             )
-        )
+        self.camera_label.setPixmap(pixmap)
 
     def display_idle(self):
         self.stack.setCurrentIndex(0)
@@ -267,13 +284,26 @@ class MachineGUI(QMainWindow):
             self.med_table.setRowHeight(i, 70)
 
         self.stack.setCurrentIndex(1)
+        # Runs after the pending paint events, closing the scan traces
+        QTimer.singleShot(0, tracer.displayed)
         QTimer.singleShot(10000, self.display_idle)
 
     def display_error(self, message):
         self.error_msg.setText(message)
         self.stack.setCurrentIndex(2)
+        QTimer.singleShot(0, tracer.displayed)
         QTimer.singleShot(6000, self.display_idle)
 
+    def display_backend_state(self, state):
+        if state == "open":
+            self.backend_label.setText("⚠ Server nicht erreichbar")
+            self.backend_label.show()
+        elif state == "half_open":
+            self.backend_label.setText("Verbindung wird geprüft …")
+            self.backend_label.show()
+        else:
+            self.backend_label.hide()
+
 
 def run_gui_app():
     app = QApplication(sys.argv)
@@ -7,6 +7,7 @@ ACCENT_COLOR = "#14b8a6"  # Teal
 TEXT_COLOR = "#f8fafc"  # Slate 50
 SURFACE_COLOR = "#1e293b"  # Slate 800
 ERROR_COLOR = "#ef4444"  # Red-500
+WARNING_COLOR = "#f59e0b"  # Amber-500
 
 
 class MachineSignals(QObject):
@@ -16,6 +17,7 @@ class MachineSignals(QObject):
     show_success = pyqtSignal(dict)
     show_error = pyqtSignal(str)
     update_frame = pyqtSignal(QImage)
+    backend_state = pyqtSignal(str)  # circuit breaker: closed, open, half_open
 
 
 # Global signals instance
@@ -0,0 +1,89 @@
+"""
+Downscaled, rate-limited camera preview for the GUI thumbnail
+"""
+
+import threading
+import time
+
+import cv2
+from PyQt6.QtGui import QImage
+
+
+class PreviewRenderer:
+    """
+    Turns camera frames into small QImages of exactly the preview label size.
+    The frame is center-cropped to the label aspect ratio and shrunk in the
+    worker thread, and QImage reads the BGR bytes directly, so the GUI thread
+    only has to blit the result. At most `fps` previews per second are made.
+    """
+
+    def __init__(self, width: int = 120, height: int = 160, fps: float = 10.0):
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.next_at = 0.0
+
+    def due(self, now=None) -> bool:
+        """True if the next preview may be rendered; reserves the slot if so."""
+        now = time.monotonic() if now is None else now
+        if now < self.next_at:
+            return False
+        self.next_at = now + self.interval
+        return True
+
+    def _crop_to_aspect(self, frame):
+        h, w = frame.shape[:2]
+        target = self.width / self.height
+        if w / h > target:
+            crop_w = int(h * target)
+            x = (w - crop_w) // 2
+            return frame[:, x : x + crop_w]
+        crop_h = int(w / target)
+        y = (h - crop_h) // 2
+        return frame[y : y + crop_h]
+
+    def render(self, frame) -> QImage:
+        small = cv2.resize(
+            self._crop_to_aspect(frame),
+            (self.width, self.height),
+            interpolation=cv2.INTER_AREA,
+        )
+        if small.ndim == 2:
+            fmt, channels = QImage.Format.Format_Grayscale8, 1
+        else:
+            fmt, channels = QImage.Format.Format_BGR888, 3
+
+        image = QImage(small.data, self.width, self.height, self.width * channels, fmt)
+        # QImage does not own numpy memory; copy the few KB into a Qt-owned buffer
+        return image.copy()
+
+
+class PreviewSelection:
+    """Which of several cameras feeds the GUI preview (shared between threads)."""
+
+    def __init__(self, cameras=None, selected: int = 0):
+        self._lock = threading.Lock()
+        self.cameras = list(cameras or [])
+        self._index = selected
+
+    def set_cameras(self, cameras, selected: int = 0):
+        with self._lock:
+            self.cameras = list(cameras)
+            self._index = selected % len(self.cameras) if self.cameras else 0
+
+    @property
+    def selected(self):
+        with self._lock:
+            return self.cameras[self._index] if self.cameras else None
+
+    def is_selected(self, camera_id) -> bool:
+        return self.selected == camera_id
+
+    def cycle(self):
+        with self._lock:
+            if self.cameras:
+                self._index = (self._index + 1) % len(self.cameras)
+
+
+# Global selection instance
+preview_selection = PreviewSelection()
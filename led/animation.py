@@ -0,0 +1,238 @@
+"""
+Vectorized LED animations rendered as numpy frames
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# Frames are (pixels, 3) uint8 arrays in RGB order
+RGB = Tuple[int, int, int]
+
+
+def to_rgb(color_int: int) -> RGB:
+    return (color_int >> 16) & 0xFF, (color_int >> 8) & 0xFF, color_int & 0xFF
+
+
+def pack(frame: np.ndarray) -> np.ndarray:
+    """Packs a frame into the 0xRRGGBB integers the strip expects."""
+    frame = frame.astype(np.uint32)
+    return (frame[:, 0] << 16) | (frame[:, 1] << 8) | frame[:, 2]
+
+
+def fill(pixels: int, color: RGB) -> np.ndarray:
+    return np.tile(np.array(color, dtype=np.uint8), (pixels, 1))
+
+
+class Effect:
+    """
+    Base class of all effects. prepare() is called once per strip size and
+    frame rate and precomputes whatever it can; render(t) then returns the
+    frame `t` seconds after the effect started, plus the seconds until the
+    next frame differs (None: never). `max_fps` caps the frame rate of
+    effects that move too slowly to need the strip rate.
+    """
+
+    max_fps: Optional[float] = None
+
+    def prepare(self, pixels: int, fps: float):
+        self.pixels = pixels
+        self.fps = fps
+
+    def render(self, t: float) -> Tuple[np.ndarray, Optional[float]]:
+        raise NotImplementedError
+
+
+class LookupEffect(Effect):
+    """
+    An animation that loops every `period` seconds, precomputed into a lookup
+    table of frames at the strip frame rate. Rendering is a single index.
+    """
+
+    period = 1.0
+
+    def prepare(self, pixels: int, fps: float):
+        if self.max_fps:
+            fps = min(fps, self.max_fps)
+        if getattr(self, "lut", None) is not None and (pixels, fps) == (
+            self.pixels,
+            self.fps,
+        ):
+            return
+        super().prepare(pixels, fps)
+        count = max(1, round(self.period * fps))
+        phases = np.arange(count, dtype=np.float32) / count
+        self.lut = np.clip(self.build(phases), 0, 255).astype(np.uint8)
+
+    def build(self, phases: np.ndarray) -> np.ndarray:
+        """Returns float frames (len(phases), pixels, 3) for phases in [0, 1)."""
+        raise NotImplementedError
+
+    def render(self, t: float):
+        index = int(t * self.fps)
+        # Wake up on the frame grid so render time does not add up as drift
+        return self.lut[index % len(self.lut)], (index + 1) / self.fps - t
+
+
+class Solid(Effect):
+    def __init__(self, color: RGB):
+        self.color = color
+
+    def prepare(self, pixels: int, fps: float):
+        super().prepare(pixels, fps)
+        self.frame = fill(pixels, self.color)
+
+    def render(self, t: float):
+        return self.frame, None
+
+
+class Blink(Effect):
+    """Whole strip on and off; only wakes the controller at each toggle."""
+
+    def __init__(self, color: RGB, interval: float = 0.3):
+        self.color = color
+        self.interval = interval
+
+    def prepare(self, pixels: int, fps: float):
+        super().prepare(pixels, fps)
+        self.frames = (fill(pixels, self.color), fill(pixels, (0, 0, 0)))
+
+    def render(self, t: float):
+        toggles = int(t // self.interval)
+        return self.frames[toggles % 2], (toggles + 1) * self.interval - t
+
+
+class ColorCycle(LookupEffect):
+    """Smooth transitions through `colors`, `transition` seconds each (idle)."""
+
+    def __init__(
+        self,
+        colors: Sequence[RGB],
+        transition: float = 3.0,
+        fps: Optional[float] = None,
+    ):
+        self.colors = np.array(colors, dtype=np.float32)
+        self.period = transition * len(colors)
+        self.max_fps = fps
+
+    def build(self, phases):
+        position = phases * len(self.colors)
+        index = position.astype(int)
+        progress = (position - index)[:, None]
+        start = self.colors[index]
+        end = self.colors[(index + 1) % len(self.colors)]
+        color = start + (end - start) * progress
+        return np.repeat(color[:, None, :], self.pixels, axis=1)
+
+
+class Breathe(LookupEffect):
+    """Brightness rising and falling on a sine."""
+
+    def __init__(self, color: RGB, period: float = 2.0, floor: float = 0.1):
+        self.color = np.array(color, dtype=np.float32)
+        self.period = period
+        self.floor = floor
+
+    def build(self, phases):
+        level = self.floor + (1 - self.floor) * (0.5 - 0.5 * np.cos(2 * np.pi * phases))
+        color = level[:, None] * self.color
+        return np.repeat(color[:, None, :], self.pixels, axis=1)
+
+
+class Spinner(LookupEffect):
+    """A head running round the ring with a fading tail, e.g. while waiting."""
+
+    def __init__(self, color: RGB, period: float = 1.0, tail: float = 0.4):
+        self.color = np.array(color, dtype=np.float32)
+        self.period = period
+        self.tail = tail
+
+    def build(self, phases):
+        positions = np.arange(self.pixels, dtype=np.float32) / self.pixels
+        # Distance of every pixel behind the head, as a fraction of the ring
+        behind = (phases[:, None] - positions[None, :]) % 1.0
+        level = np.clip(1 - behind / self.tail, 0, 1) ** 2
+        return level[:, :, None] * self.color
+
+
+class Chase(LookupEffect):
+    """Evenly spaced blocks of `width` pixels moving along the strip."""
+
+    def __init__(self, color: RGB, width: int = 3, gap: int = 3, speed: float = 10.0):
+        self.color = np.array(color, dtype=np.float32)
+        self.width = width
+        self.spacing = width + gap
+        # One full spacing per period, `speed` pixels per second
+        self.period = self.spacing / speed
+
+    def build(self, phases):
+        shift = (phases * self.spacing).astype(int)
+        index = np.arange(self.pixels)
+        lit = (index[None, :] - shift[:, None]) % self.spacing < self.width
+        return lit[:, :, None] * self.color
+
+
+class Progress(Effect):
+    """
+    Fills the ring over `duration` seconds, e.g. while dispensing. The edge
+    pixel fades in over `SUBSTEPS` steps; frames are computed on demand since
+    a table of every step would grow with the square of the strip length.
+    """
+
+    SUBSTEPS = 8
+
+    def __init__(self, color: RGB, duration: float):
+        self.color = np.array(color, dtype=np.float32)
+        self.duration = duration
+
+    def prepare(self, pixels: int, fps: float):
+        super().prepare(pixels, fps)
+        self.steps = pixels * self.SUBSTEPS
+        self.index = np.arange(pixels, dtype=np.float32)
+
+    def render(self, t: float):
+        step = min(self.steps, int(t / self.duration * self.steps))
+        levels = np.clip(step / self.SUBSTEPS - self.index, 0, 1)
+        frame = (levels[:, None] * self.color).astype(np.uint8)
+        if step == self.steps:
+            return frame, None
+        return frame, (step + 1) * self.duration / self.steps - t
+
+
+class AnimationEngine:
+    """
+    Renders the current effect and crossfades from the last frame shown to a
+    new effect over `blend` seconds when it is switched.
+    """
+
+    def __init__(self, pixels: int, fps: float, blend: float = 0.15):
+        self.pixels = pixels
+        self.fps = fps
+        self.blend = blend
+        self.effect: Effect = Solid((0, 0, 0))
+        self.effect.prepare(pixels, fps)
+        self.started_at = 0.0
+        self.frame = fill(pixels, (0, 0, 0))
+        self._blend_from: Optional[np.ndarray] = None
+
+    def switch(self, effect: Effect, now: float, blend: Optional[float] = None):
+        effect.prepare(self.pixels, self.fps)
+        self._blend_from = self.frame.astype(np.float32)
+        self._blend = self.blend if blend is None else blend
+        self.effect = effect
+        self.started_at = now
+
+    def render(self, now: float) -> Tuple[np.ndarray, Optional[float]]:
+        t = now - self.started_at
+        frame, delay = self.effect.render(t)
+        if self._blend_from is not None:
+            if t < self._blend:
+                weight = t / self._blend
+                frame = (self._blend_from * (1 - weight) + frame * weight).astype(
+                    np.uint8
+                )
+                delay = 1 / self.fps
+            else:
+                self._blend_from = None
+        self.frame = frame
+        return frame, delay
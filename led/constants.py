@@ -1,4 +1,13 @@
-from rpi_ws281x import Color, ws
+try:
+    from rpi_ws281x import Color, ws
+
+    WS2811_STRIP_GRB = ws.WS2811_STRIP_GRB
+except ImportError:
+    # Off the Pi the simulated strip is used, colours are packed the same way
+    def Color(red, green, blue, white=0):
+        return (white << 24) | (red << 16) | (green << 8) | blue
+
+    WS2811_STRIP_GRB = 0x00081000
 
 # Farben erstellen
 COLOR_RED = Color(255, 0, 0)
@@ -9,6 +18,19 @@ COLOR_LOGO_BLUE = Color(0, 102, 204)  # #0066cc
 COLOR_LOGO_TURQUOISE = Color(0, 168, 168)  # #00a8a8
 COLOR_WHITE = Color(255, 255, 255)  # #ffffff
 
+# Priorities of LED states: a state replaces one of equal or lower priority,
+# a lower one is shown after the current state timed out
+PRIORITY_IDLE = 0
+PRIORITY_BUSY = 1
+PRIORITY_ERROR = 2
+PRIORITY_SUCCESS = 3
+
+# Animation (frames per second of moving effects, crossfade between states)
+LED_FPS = 50
+LED_BLEND = 0.15
+# The slow idle colour cycle changes too little for more to be visible
+IDLE_FPS = 20
+
 # Strip Settings
 LED_COUNT = 24
 LED_GPIO_PIN = 18
@@ -17,7 +39,7 @@ LED_DMA = 10
 LED_INVERT = False
 LED_BRIGHTNESS = 255
 LED_CHANNEL = 0
-LED_TYPE = ws.WS2811_STRIP_GRB
+LED_TYPE = WS2811_STRIP_GRB
 
 STRIP_PARAMETERS = [
     LED_COUNT,
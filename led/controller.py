@@ -1,119 +1,238 @@
 import time
-from threading import Thread
-from typing import Any, List, Tuple
+from queue import Empty, SimpleQueue
+from threading import Lock, Thread
+from typing import Any, List, Optional
 
-from rpi_ws281x import Color, PixelStrip
+import numpy as np
+from tracing import Histogram
 
+from .animation import AnimationEngine, Blink, ColorCycle, Effect, Solid, pack, to_rgb
 from .constants import (
+    IDLE_FPS,
+    LED_BLEND,
     LED_COUNT,
+    LED_FPS,
+    PRIORITY_BUSY,
+    PRIORITY_ERROR,
+    PRIORITY_IDLE,
     STRIP_PARAMETERS,
 )
+from .strip import create_strip
+
+BLINK_INTERVAL = 0.3
+# Lower priority states waiting behind the current one
+FOLLOW_UP_LIMIT = 3
+
+
+class LEDCommand:
+    """A requested LED state, `duration` 0 keeps it until it is replaced."""
+
+    def __init__(
+        self,
+        mode: str,
+        effect: Effect,
+        duration: float = 0,
+        priority: int = PRIORITY_IDLE,
+        follow_up: bool = True,
+    ):
+        self.mode = mode
+        self.effect = effect
+        self.duration = duration
+        self.priority = priority
+        # Transient states (e.g. waiting on the backend) are dropped instead
+        # of being shown after a higher priority one
+        self.follow_up = follow_up
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        # Only commands applied straight from the queue count towards latency
+        self.measured = False
+
+    @property
+    def ends_at(self) -> Optional[float]:
+        if self.duration <= 0 or self.started_at is None:
+            return None
+        return self.started_at + self.duration
 
 
 class LEDController(Thread):
-    def __init__(self, params: List[Any] = STRIP_PARAMETERS) -> None:
+    """
+    Owns the strip in its own thread. set_color, set_blink and set_idle only
+    put an LEDCommand on a queue, all state lives in run(). A command of equal
+    or higher priority than the current state replaces it (errors preempt
+    idle, success preempts errors), a lower one waits as a follow-up until the
+    current state times out.
+    """
+
+    def __init__(
+        self, params: List[Any] = STRIP_PARAMETERS, backend: str = "auto"
+    ) -> None:
         super().__init__()
-        self.strip = PixelStrip(*params)
-        self.strip.begin()
-
-        # State management
-        self.mode = "idle"  # idle, solid, blink
-        self.current_color = (0, 0, 0)
-        self.target_color = (0, 0, 0)
+        self.strip = create_strip(params, backend)
 
         # Animation variables
-        self.idle_colors = [
-            (255, 255, 255),  # COLOR_WHITE
-            (0, 102, 204),  # COLOR_LOGO_BLUE
-            (0, 168, 168),  # COLOR_LOGO_TURQUOISE
-        ]
-        self.idle_index = 0
-        self.transition_start_time = time.time()
-        self.transition_duration = 3.0  # seconds per transition
-
-        self.blink_color = (255, 255, 0)
-        self.blink_end_time = 0
-        self.blink_state = False
-        self.last_blink_toggle = 0
-
-        self.timeout_time = 0
-        self.daemon = True
+        self.engine = AnimationEngine(LED_COUNT, LED_FPS, LED_BLEND)
+        self.idle_effect = ColorCycle(
+            [
+                (255, 255, 255),  # COLOR_WHITE
+                (0, 102, 204),  # COLOR_LOGO_BLUE
+                (0, 168, 168),  # COLOR_LOGO_TURQUOISE
+            ],
+            transition=3.0,  # seconds per transition
+            fps=IDLE_FPS,
+        )
 
-    def _get_rgb(self, color_int: int) -> Tuple[int, int, int]:
-        return (color_int >> 16) & 0xFF, (color_int >> 8) & 0xFF, color_int & 0xFF
+        self.daemon = True
 
-    def _set_all(self, r: int, g: int, b: int):
-        color = Color(int(r), int(g), int(b))
-        for i in range(LED_COUNT):
-            self.strip.setPixelColor(i, color)
+        # Written by any thread, read by run() only
+        self.commands = SimpleQueue()
+        # Owned by run()
+        self.state = self._activate(self._idle(), measure=False)
+        self.follow_ups = []
+        # Packed pixels currently on the strip, only changed ones are pushed
+        self.shown = None
+
+        self._metrics_lock = Lock()
+        self.frames_pushed = 0
+        self.preempted = 0
+        self.queued = 0
+        self.dropped = 0
+        # Submit of a command until its first frame is on the strip
+        self.latency = Histogram()
+
+    def _show(self, frame: np.ndarray):
+        packed = pack(frame)
+        if self.shown is None:
+            changed = range(LED_COUNT)
+        else:
+            changed = np.flatnonzero(packed != self.shown)
+            if not len(changed):
+                return
+        for i in changed:
+            self.strip.setPixelColor(int(i), int(packed[i]))
         self.strip.show()
+        self.shown = packed
+        self.frames_pushed += 1
 
-    def _interpolate(
-        self, start: Tuple[int, int, int], end: Tuple[int, int, int], progress: float
-    ) -> Tuple[int, int, int]:
-        return (
-            int(start[0] + (end[0] - start[0]) * progress),
-            int(start[1] + (end[1] - start[1]) * progress),
-            int(start[2] + (end[2] - start[2]) * progress),
-        )
+    def _idle(self) -> LEDCommand:
+        return LEDCommand("idle", self.idle_effect)
 
     def set_idle(self):
-        self.mode = "idle"
-        self.transition_start_time = time.time()
-
-    def set_color(self, color_int: int, timeout: float = 0):
-        self.mode = "solid"
-        self.target_color = self._get_rgb(color_int)
-        if timeout > 0:
-            self.timeout_time = time.time() + timeout
-        else:
-            self.timeout_time = 0
+        """Returns to the idle animation and discards queued follow-ups."""
+        self.commands.put(self._idle())
+
+    def set_color(
+        self, color_int: int, timeout: float = 0, priority: int = PRIORITY_ERROR
+    ):
+        self.commands.put(
+            LEDCommand("solid", Solid(to_rgb(color_int)), timeout, priority)
+        )
 
-    def set_blink(self, color_int: int, duration: float):
-        self.mode = "blink"
-        self.blink_color = self._get_rgb(color_int)
-        self.blink_end_time = time.time() + duration
-        self.last_blink_toggle = time.time()
-        self.blink_state = True
+    def set_blink(
+        self, color_int: int, duration: float, priority: int = PRIORITY_ERROR
+    ):
+        self.commands.put(
+            LEDCommand(
+                "blink", Blink(to_rgb(color_int), BLINK_INTERVAL), duration, priority
+            )
+        )
 
-    def run(self):
-        while True:
-            now = time.time()
-
-            if self.mode == "idle":
-                # Smooth transition between idle colors
-                elapsed = (now - self.transition_start_time) % (
-                    self.transition_duration * len(self.idle_colors)
-                )
-                self.idle_index = int(elapsed // self.transition_duration)
-                progress = (
-                    elapsed % self.transition_duration
-                ) / self.transition_duration
-
-                start_c = self.idle_colors[self.idle_index]
-                end_c = self.idle_colors[(self.idle_index + 1) % len(self.idle_colors)]
-
-                r, g, b = self._interpolate(start_c, end_c, progress)
-                self._set_all(r, g, b)
-
-            elif self.mode == "blink":
-                if now > self.blink_end_time:
-                    self.set_idle()
-                    continue
-
-                if now - self.last_blink_toggle > 0.3:  # 300ms blink rate
-                    self.blink_state = not self.blink_state
-                    self.last_blink_toggle = now
-
-                if self.blink_state:
-                    self._set_all(*self.blink_color)
+    def set_effect(
+        self,
+        effect: Effect,
+        duration: float = 0,
+        priority: int = PRIORITY_BUSY,
+        follow_up: bool = True,
+    ):
+        """Shows any effect from led.animation, e.g. a spinner while waiting."""
+        self.commands.put(LEDCommand("effect", effect, duration, priority, follow_up))
+
+    def _activate(self, command: LEDCommand, measure: bool = True) -> LEDCommand:
+        command.started_at = time.monotonic()
+        command.measured = not measure
+        self.engine.switch(command.effect, command.started_at)
+        return command
+
+    def _apply(self, command: LEDCommand):
+        with self._metrics_lock:
+            if command.mode == "idle":
+                self.follow_ups.clear()
+                self.state = self._activate(command)
+            elif command.priority >= self.state.priority:
+                if self.state.mode != "idle":
+                    self.preempted += 1
+                self.state = self._activate(command)
+            elif command.duration > 0 and command.follow_up:
+                # Highest priority first, FIFO within a priority
+                self.follow_ups.append(command)
+                self.follow_ups.sort(key=lambda c: -c.priority)
+                self.queued += 1
+                if len(self.follow_ups) > FOLLOW_UP_LIMIT:
+                    self.follow_ups.pop()
+                    self.dropped += 1
+            else:
+                # Would wait behind the current state forever
+                self.dropped += 1
+
+    def _advance(self, now: float):
+        """Moves on to the next follow-up or idle once the state timed out."""
+        while self.state.ends_at is not None and now >= self.state.ends_at:
+            with self._metrics_lock:
+                if self.follow_ups:
+                    command = self.follow_ups.pop(0)
                 else:
-                    self._set_all(0, 0, 0)
+                    command = self._idle()
+                self.state = self._activate(command, measure=False)
+
+    def _render(self, now: float) -> Optional[float]:
+        """
+        Pushes the frame for `now` and returns how long nothing will change,
+        None if only a new command can change it.
+        """
+        state = self.state
+        frame, delay = self.engine.render(now)
+        self._show(frame)
+
+        if not state.measured:
+            state.measured = True
+            with self._metrics_lock:
+                self.latency.add((time.monotonic() - state.submitted_at) * 1000)
+
+        if state.ends_at is not None:
+            remaining = state.ends_at - now
+            delay = remaining if delay is None else min(delay, remaining)
+        return delay
 
-            elif self.mode == "solid":
-                if self.timeout_time > 0 and now > self.timeout_time:
-                    self.set_idle()
-                    continue
-                self._set_all(*self.target_color)
-
-            time.sleep(0.05)
+    def run(self):
+        delay = 0
+        while True:
+            try:
+                command = self.commands.get(timeout=delay)
+            except Empty:
+                pass
+            else:
+                self._apply(command)
+                # Apply everything that queued up before drawing a frame
+                while True:
+                    try:
+                        self._apply(self.commands.get_nowait())
+                    except Empty:
+                        break
+
+            now = time.monotonic()
+            self._advance(now)
+            delay = self._render(now)
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            latency = self.latency.to_dict()
+            return {
+                "state": self.state.mode,
+                "priority": self.state.priority,
+                "follow_ups": len(self.follow_ups),
+                "frames_pushed": self.frames_pushed,
+                "preempted": self.preempted,
+                "queued": self.queued,
+                "dropped": self.dropped,
+                "latency_mean_ms": latency["mean_ms"],
+                "latency_max_ms": latency["max_ms"],
+            }
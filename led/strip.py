@@ -0,0 +1,66 @@
+"""
+LED strip backends: the rpi_ws281x hardware strip or a recording simulation
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("auto", "hardware", "simulated")
+
+
+class SimulatedStrip:
+    """
+    Software stand-in for rpi_ws281x.PixelStrip with the methods the
+    controller uses. Every show() records (monotonic time, pixel colours) so
+    frame timing can be measured without a Raspberry Pi.
+    """
+
+    def __init__(self, num, *args, max_frames: int = 10000, **kwargs):
+        self.pixels = [0] * num
+        self.frames = deque(maxlen=max_frames)
+        self.shows = 0
+
+    def begin(self):
+        pass
+
+    def numPixels(self) -> int:
+        return len(self.pixels)
+
+    def setPixelColor(self, n: int, color: int):
+        self.pixels[n] = color
+
+    def getPixelColor(self, n: int) -> int:
+        return self.pixels[n]
+
+    def show(self):
+        self.frames.append((time.monotonic(), tuple(self.pixels)))
+        self.shows += 1
+
+
+def create_strip(params: List[Any], backend: str = "auto"):
+    """
+    Returns a started strip. "auto" uses the hardware strip when rpi_ws281x
+    is installed and the PWM/DMA setup succeeds, the simulation otherwise.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LED backend {backend!r}, expected one of {BACKENDS}")
+
+    if backend != "simulated":
+        try:
+            from rpi_ws281x import PixelStrip
+
+            strip = PixelStrip(*params)
+            strip.begin()
+            return strip
+        except (ImportError, RuntimeError) as e:
+            if backend == "hardware":
+                raise
+            logger.warning(f"⚠️ No LED hardware ({e}), using the simulated strip")
+
+    strip = SimulatedStrip(*params)
+    strip.begin()
+    return strip
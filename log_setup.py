@@ -0,0 +1,106 @@
+"""
+Non-blocking logging: records are queued by the calling thread and written by
+a background listener, so slow stdout/journald writes never stall scanning.
+"""
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted records in memory."""
+
+    def __init__(self, capacity: int = 1000):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self._ring_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._ring_lock:
+            self.records.append(line)
+
+    def recent(self, n=None):
+        with self._ring_lock:
+            records = list(self.records)
+        return records if n is None else records[-n:]
+
+
+ring_buffer = RingBufferHandler()
+_listener = None
+
+
+def parse_levels(spec: str) -> dict:
+    """Parses "client=DEBUG,scanner_parts=WARNING" into {logger name: level}."""
+    levels = {}
+    for part in spec.split(","):
+        name, _, level = part.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(
+    level: str = "INFO",
+    levels: str = "",
+    ring_size: int = 1000,
+    queue_size: int = 10000,
+):
+    """
+    Routes all records through a bounded queue to a background writer and a
+    ring buffer of recent records. `levels` sets per-subsystem levels.
+    Safe to call more than once; only the first call installs the handlers.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(formatter)
+    ring_buffer.records = deque(maxlen=ring_size)
+    ring_buffer.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(level.upper())
+    for name, subsystem_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(subsystem_level)
+
+    _listener = QueueListener(log_queue, stream, ring_buffer)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def recent_records(n=None):
+    """Returns the most recent formatted log lines."""
+    return ring_buffer.recent(n)
@@ -3,75 +3,168 @@
 Main script for client firmware integrating LED control, QR scanning, and GUI.
 """
 
+import logging
 import sys
 import threading
+import time
 
-import cv2
-from client import send_scan
-from config import API_URL, CAMERA_ID, DUPLICATE_TIMEOUT
-from dedup import Deduplicator
+from client import (
+    breaker,
+    health_probe,
+    outbox,
+    scan_executor,
+    send_scan,
+    stop_engine,
+    validation_cache,
+)
+from client_parts.session import connection_metrics
+from config import (
+    API_URL,
+    CAMERA_IDS,
+    DEDUP_FLUSH_INTERVAL,
+    DEDUP_MAX_SIZE,
+    DEDUP_STORE_PATH,
+    DUPLICATE_TIMEOUT,
+    LED_BACKEND,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_QUEUE_SIZE,
+    LOG_RING_SIZE,
+    PREVIEW_CAMERA,
+    PREVIEW_FPS,
+    PREVIEW_HEIGHT,
+    PREVIEW_WIDTH,
+    SCANNER_STATS_INTERVAL,
+    TRACE_ENABLED,
+    TRACE_EXPORT_PATH,
+    TRACE_MAX_TRACES,
+)
+from dedup import DedupStore, Deduplicator
 from gui import MachineGUI
 from gui_parts.constants import gui_signals
+from gui_parts.preview import PreviewRenderer, preview_selection
 from led.controller import LEDController
-from PyQt6.QtGui import QImage
+from log_setup import setup_logging
 from PyQt6.QtWidgets import QApplication
 from scanner import scan_camera
+from scanner_parts.capture import ScannerStats
+from tracing import tracer
 
+logger = logging.getLogger("main")
 
-def scanner_worker(led_controller):
+
+def scanner_worker(led_controller, camera_id, dedup, stats):
     """
-    Background worker for QR code scanning and camera feed updates.
+    Background worker for QR code scanning and camera feed updates of one camera.
     """
-    dedup = Deduplicator(DUPLICATE_TIMEOUT)
+    preview = PreviewRenderer(PREVIEW_WIDTH, PREVIEW_HEIGHT, PREVIEW_FPS)
 
     while True:
         try:
-            for data, frame in scan_camera(CAMERA_ID):
-                # 1. Update GUI Camera Feed
-                if frame is not None:
-                    # Convert BGR (OpenCV) to RGB (Qt)
-                    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    h, w, ch = rgb_image.shape
-                    bytes_per_line = ch * w
-                    qt_image = QImage(
-                        rgb_image.data,
-                        w,
-                        h,
-                        bytes_per_line,
-                        QImage.Format.Format_RGB888,
-                    )
+            for codes, frame in scan_camera(camera_id, stats):
+                # 1. Update GUI Camera Feed (downscaled, at most PREVIEW_FPS)
+                if (
+                    frame is not None
+                    and preview_selection.is_selected(camera_id)
+                    and preview.due()
+                ):
                     # Emit signal to update GUI in main thread
-                    gui_signals.update_frame.emit(qt_image)
+                    gui_signals.update_frame.emit(preview.render(frame))
 
-                # 2. Process QR Data
-                if data:
+                # 2. Process QR Data (all new codes of a frame as one batch)
+                new_codes = []
+                for data in codes:
                     if dedup.is_new(data):
-                        print(f"📦 Neuer Scan: {data}")
-                        send_scan(API_URL, data, led_controller)
+                        tracer.mark(data, "dedup")
+                        new_codes.append(data)
+                    else:
+                        tracer.discard(data)
+                if new_codes:
+                    logger.info(
+                        f"📦 Neuer Scan (Kamera {camera_id}): {', '.join(new_codes)}"
+                    )
+                    rejected = send_scan(API_URL, new_codes, led_controller)
+                    # Not sent: the next frame showing them may try again
+                    for data in rejected:
+                        dedup.forget(data)
+                        tracer.discard(data, committed=True)
 
         except Exception as e:
-            print(f"Scanner Error: {e}")
+            logger.error(f"Scanner Error (Kamera {camera_id}): {e}")
+            # Avoid a busy loop while a camera is unplugged
+            time.sleep(1)
             continue
 
 
+def stats_worker(camera_stats, dedup, led_controller):
+    """
+    Periodically logs frame rates of every camera pipeline and HTTP metrics
+    and exports the scan traces.
+    """
+    while True:
+        time.sleep(SCANNER_STATS_INTERVAL)
+        for camera_id, stats in camera_stats.items():
+            rates = [
+                f"{name} {rate:.1f}/s" for name, rate in sorted(stats.rates().items())
+            ]
+            rates += [
+                f"{name} {seconds:.0f} s"
+                for name, seconds in sorted(stats.durations().items())
+            ]
+            logger.info(f"📷 Kamera {camera_id}: {', '.join(rates)}")
+        logger.info(f"🔁 Dedup: {dedup.metrics()}")
+        logger.info(f"💡 LED: {led_controller.metrics()}")
+        logger.info(f"🌐 HTTP: {connection_metrics.snapshot()}")
+        logger.info(f"📨 Scan queue: {scan_executor.metrics()}")
+        logger.info(f"📮 Completion outbox: {outbox.metrics()}")
+        logger.info(f"💾 Validation cache: {validation_cache.metrics()}")
+        logger.info(f"🩺 Backend health: {health_probe.metrics()}")
+        logger.info(f"🔌 Backend circuit: {breaker.metrics()}")
+        if tracer.enabled and TRACE_EXPORT_PATH:
+            tracer.export(TRACE_EXPORT_PATH)
+
+
 def main():
+    setup_logging(LOG_LEVEL, LOG_LEVELS, LOG_RING_SIZE, LOG_QUEUE_SIZE)
+    tracer.configure(TRACE_ENABLED, TRACE_MAX_TRACES)
+
     # 1. Initialize LED Controller
-    controller = LEDController()
+    controller = LEDController(backend=LED_BACKEND)
     controller.start()
     controller.set_idle()
 
-    # 2. Start Scanner Thread
-    scan_thread = threading.Thread(
-        target=scanner_worker, args=(controller,), daemon=True
-    )
-    scan_thread.start()
+    # Warm the backend connection while cameras and GUI start up
+    health_probe.start()
+
+    # 2. Start one Scanner Thread per camera, sharing the deduplicator. Its
+    # window is restored so a restart does not validate the same code twice
+    dedup_store = DedupStore(DEDUP_STORE_PATH, DEDUP_FLUSH_INTERVAL)
+    dedup = Deduplicator(DUPLICATE_TIMEOUT, DEDUP_MAX_SIZE, store=dedup_store)
+    camera_stats = {camera_id: ScannerStats() for camera_id in CAMERA_IDS}
+    preview_selection.set_cameras(CAMERA_IDS, PREVIEW_CAMERA)
+
+    for camera_id, stats in camera_stats.items():
+        scan_thread = threading.Thread(
+            target=scanner_worker,
+            args=(controller, camera_id, dedup, stats),
+            daemon=True,
+        )
+        scan_thread.start()
+
+    if SCANNER_STATS_INTERVAL > 0:
+        threading.Thread(
+            target=stats_worker, args=(camera_stats, dedup, controller), daemon=True
+        ).start()
 
     # 3. Launch GUI (Main Thread)
     app = QApplication(sys.argv)
     _ = MachineGUI(gui_signals)
 
     # Run the application
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    stop_engine()
+    dedup_store.flush()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ from datetime import datetime
 
 import uvicorn
 from config import API_LISTEN_HOST, API_LISTEN_PORT, MACHINE_ACCESS_TOKEN
-from fastapi import FastAPI, Header
+from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel
 from schemas.location import Location
 
@@ -93,6 +93,40 @@ async def validate_qr(
     )
 
 
+class CompletionBatchRequest(BaseModel):
+    order_ids: list[int]
+
+
+@app.post("/api/v1/orders/complete-batch")
+async def complete_orders(
+    request: CompletionBatchRequest,
+    x_machine_token: str | None = Header(None, alias="X-Machine-Token"),
+):
+    """
+    Marks several orders as completed in one request (outbox replay).
+    """
+    if x_machine_token != MACHINE_ACCESS_TOKEN:
+        raise HTTPException(status_code=401, detail="Machine authorization failed")
+
+    print(f"✅ Bestellungen abgeschlossen: {request.order_ids}")
+    return {"completed": request.order_ids, "failed": []}
+
+
+@app.post("/api/v1/orders/{order_id}/complete")
+async def complete_order(
+    order_id: int,
+    x_machine_token: str | None = Header(None, alias="X-Machine-Token"),
+):
+    """
+    Marks an order as completed after the machine dispensed it.
+    """
+    if x_machine_token != MACHINE_ACCESS_TOKEN:
+        raise HTTPException(status_code=401, detail="Machine authorization failed")
+
+    print(f"✅ Bestellung #{order_id} abgeschlossen")
+    return {"id": order_id, "status": "completed"}
+
+
 # Legacy endpoint for compatibility during transition
 @app.post("/api/scan")
 async def legacy_scan(request: ScanRequest):
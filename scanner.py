@@ -2,21 +2,131 @@
 Module to scan from a camera
 """
 
-import cv2
+from config import (
+    CAMERA_BUFFER_SIZE,
+    CAMERA_FOURCC,
+    CAMERA_FPS,
+    CAMERA_GRAYSCALE,
+    CAMERA_HEIGHT,
+    CAMERA_WIDTH,
+    GOVERNOR_IDLE_AFTER,
+    GOVERNOR_IDLE_FPS,
+    GOVERNOR_IDLE_HEIGHT,
+    GOVERNOR_IDLE_WIDTH,
+    MOTION_AREA,
+    MOTION_HOLD,
+    MOTION_IDLE_INTERVAL,
+    MOTION_THRESHOLD,
+    QR_CALIBRATION_DIR,
+    QR_DECODER,
+    QR_MULTI,
+    ROI_FULL_INTERVAL,
+    ROI_MAX_MISSES,
+    ROI_PADDING,
+    ROI_SCALE,
+)
+from scanner_parts.capture import FrameGrabber, ScannerStats
+from scanner_parts.decoders import create_decoder
+from scanner_parts.governor import CaptureGovernor
+from scanner_parts.motion import MotionGate
+from scanner_parts.sources import open_source, to_luma
+from scanner_parts.tracking import RoiTracker
+from tracing import tracer
 
+CAMERA_SETTINGS = {
+    "fourcc": CAMERA_FOURCC,
+    "width": CAMERA_WIDTH,
+    "height": CAMERA_HEIGHT,
+    "fps": CAMERA_FPS,
+    "buffer_size": CAMERA_BUFFER_SIZE,
+    "raw": CAMERA_GRAYSCALE,
+}
 
-def scan_camera(camera_id):
-    cap = cv2.VideoCapture(camera_id)
-    detector = cv2.QRCodeDetector()
+
+def scan_camera(camera_id, stats=None, realtime=True):
+    """
+    Yields (codes, frame) for the freshest camera frame, codes being the list of
+    all payloads decoded in it (only the first one unless QR_MULTI is set).
+    Capturing runs in its own thread, so a slow decode never lets old frames pile up in the device buffer.
+    `camera_id` may also be a video file, an image directory or "synthetic"
+    (see scanner_parts.sources); realtime=False replays those as fast as
+    possible without dropping frames.
+    Frames without scene change are not decoded (codes is []) apart from a probe
+    every MOTION_IDLE_INTERVAL seconds, and once a code was
+    found only a crop around its last position is decoded (with QR_MULTI the full
+    frame every ROI_FULL_INTERVAL frames). Cameras drop to idle
+    capture settings after GOVERNOR_IDLE_AFTER seconds without decoding.
+    With CAMERA_GRAYSCALE the pipeline runs on the luma plane only.
+    Pass a ScannerStats instance to observe the pipeline counters.
+    """
+    cap = open_source(camera_id, realtime, CAMERA_SETTINGS)
+    decoder = create_decoder(QR_DECODER, QR_CALIBRATION_DIR, QR_MULTI)
+    tracker = RoiTracker(
+        ROI_PADDING, ROI_SCALE, ROI_MAX_MISSES, ROI_FULL_INTERVAL if QR_MULTI else 0
+    )
+    gate = MotionGate(MOTION_THRESHOLD, MOTION_HOLD, MOTION_AREA, MOTION_IDLE_INTERVAL)
 
     if not cap.isOpened():
         raise RuntimeError("Kamera konnte nicht geöffnet werden")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    if stats is None:
+        stats = ScannerStats()
+
+    paced = getattr(cap, "realtime", True)
+    # Unpaced replay runs faster than real time, so the gate counts frames at the
+    # source's nominal rate instead and MOTION_HOLD covers the same footage
+    frame_interval = getattr(getattr(cap, "pacer", None), "interval", 0) or 1 / 30
+    frames = 0
+
+    grabber = FrameGrabber(cap, stats, drop=paced)
+    governor = CaptureGovernor(
+        grabber,
+        stats,
+        GOVERNOR_IDLE_AFTER,
+        (GOVERNOR_IDLE_WIDTH, GOVERNOR_IDLE_HEIGHT),
+        GOVERNOR_IDLE_FPS,
+    )
+    grabber.start()
+
+    try:
+        while True:
+            latest = grabber.latest()
+            if latest is None:
+                break
+
+            frame, captured_at = latest
+            frames += 1
+            now = captured_at if paced else frames * frame_interval
+            if CAMERA_GRAYSCALE:
+                frame = to_luma(frame)
+            decode = tracker.tracking or gate.should_decode(frame, now)
+            # Motion or a recent detection keeps the camera active; idle probes
+            # of a static scene do not
+            if governor.tick(captured_at, gate.active(now)):
+                # The resolution change must not count as motion, and the last
+                # bounding box no longer matches the frame size
+                gate.rebase()
+                tracker.reset()
+            if not decode:
+                stats.incr("skipped")
+                yield [], frame
+                continue
 
-        data, bbox, _ = detector.detectAndDecode(frame)
+            roi = tracker.region(frame)
+            if QR_MULTI:
+                codes, bbox = decoder.decode_multi(roi.image)
+            else:
+                data, bbox = decoder.decode(roi.image)
+                codes = [data] if data else []
+            for code in codes:
+                tracer.start(code, captured_at)
+            tracker.update(roi, bbox)
+            if bbox is not None:
+                gate.keep_active(now)
+            stats.incr("decoded")
+            stats.incr("full_decodes" if roi.is_full_frame else "roi_decodes")
 
-        yield data, frame
+            yield codes, frame
+    finally:
+        governor.close()
+        grabber.stop()
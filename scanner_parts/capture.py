@@ -0,0 +1,134 @@
+"""
+Threaded camera capture that only keeps the newest frame
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import DefaultDict
+
+
+class ScannerStats:
+    """
+    Thread-safe frame counters of a scanner pipeline. Counters named
+    "<name>_seconds" accumulate durations instead of events.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Events stay ints, durations add up as floats
+        self._counters: DefaultDict[str, float] = defaultdict(int)
+        self.started_at = time.monotonic()
+
+    def incr(self, name: str, amount: float = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def __getitem__(self, name: str) -> float:
+        with self._lock:
+            return self._counters[name]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def rates(self) -> dict:
+        """Event counters divided by the seconds since the stats were created."""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            name: count / elapsed
+            for name, count in self.snapshot().items()
+            if not name.endswith("_seconds")
+        }
+
+    def durations(self) -> dict:
+        """The "<name>_seconds" counters, keyed by <name>."""
+        return {
+            name[: -len("_seconds")]: seconds
+            for name, seconds in self.snapshot().items()
+            if name.endswith("_seconds")
+        }
+
+
+class FrameGrabber(threading.Thread):
+    """
+    Reads frames from an opened capture as fast as the device delivers them and
+    keeps only the most recent one in a single slot. Frames that are replaced
+    before the decode stage picked them up are counted as dropped. With
+    drop=False (offline replay) the grabber waits for the slot to be taken
+    instead, so every frame gets decoded.
+    """
+
+    def __init__(self, cap, stats: ScannerStats, drop: bool = True):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.stats = stats
+        self.drop = drop
+        self._cond = threading.Condition()
+        self._frame = None
+        self._captured_at = 0.0
+        self._running = True
+        self._finished = False
+        self._pending_settings = None
+
+    def request(self, settings: dict):
+        """Queues capture property changes; they are applied before the next read."""
+        with self._cond:
+            self._pending_settings = dict(settings)
+
+    def _apply_pending(self):
+        with self._cond:
+            settings, self._pending_settings = self._pending_settings, None
+        if settings:
+            for prop, value in settings.items():
+                self.cap.set(prop, value)
+
+    def run(self):
+        while self._running:
+            self._apply_pending()
+            ret, frame = self.cap.read()
+            captured_at = time.monotonic()
+
+            with self._cond:
+                if not ret:
+                    self._finished = True
+                    self._cond.notify_all()
+                    return
+
+                while not self.drop and self._frame is not None and self._running:
+                    self._cond.wait()
+
+                if self._frame is not None:
+                    self.stats.incr("dropped")
+                self._frame = frame
+                self._captured_at = captured_at
+                self.stats.incr("captured")
+                self._cond.notify_all()
+
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
+
+    def latest(self):
+        """
+        Blocks until a frame is available and takes it out of the slot.
+        Returns (frame, captured_at) or None once the capture has ended.
+        """
+        with self._cond:
+            while self._frame is None and not self._finished:
+                self._cond.wait()
+
+            if self._frame is None:
+                return None
+
+            frame, captured_at = self._frame, self._captured_at
+            self._frame = None
+            self._cond.notify_all()
+            return frame, captured_at
+
+    def stop(self, timeout: float = 1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.join(timeout)
+        self.cap.release()
@@ -0,0 +1,242 @@
+"""
+Pluggable QR decoder backends
+"""
+
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Camera workers start together; only the first one may run the calibration
+_select_lock = threading.Lock()
+
+
+class QRDecoder:
+    """
+    Common interface of all backends. `decode` returns (data, points) where
+    data is "" if nothing was decoded and points is an Nx2 array of the code
+    corners (or None if no code was located at all).
+    """
+
+    name = "base"
+
+    def decode(self, image):
+        raise NotImplementedError
+
+    def decode_multi(self, image):
+        """
+        Decodes every code in the image in one pass. Returns (codes, points)
+        with the decoded payloads and the corners of all located codes stacked
+        into one Nx2 array (None if nothing was located).
+        """
+        data, points = self.decode(image)
+        return ([data] if data else []), points
+
+
+def _to_gray(image):
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+class OpenCVDecoder(QRDecoder):
+    name = "opencv"
+
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+
+    def decode(self, image):
+        data, bbox, _ = self.detector.detectAndDecode(image)
+        if bbox is None:
+            return "", None
+        return data or "", bbox.reshape(-1, 2)
+
+    def decode_multi(self, image):
+        found, infos, points, _ = self.detector.detectAndDecodeMulti(image)
+        if not found or points is None:
+            return [], None
+        return [data for data in infos if data], points.reshape(-1, 2)
+
+
+class PyzbarDecoder(QRDecoder):
+    name = "pyzbar"
+
+    def __init__(self):
+        from pyzbar import pyzbar
+
+        self.pyzbar = pyzbar
+        self.symbols = [pyzbar.ZBarSymbol.QRCODE]
+
+    def decode(self, image):
+        codes, points = self.decode_multi(image)
+        return (codes[0] if codes else ""), points
+
+    def decode_multi(self, image):
+        results = self.pyzbar.decode(_to_gray(image), symbols=self.symbols)
+        if not results:
+            return [], None
+        points = np.array(
+            [(p.x, p.y) for result in results for p in result.polygon],
+            dtype=np.float32,
+        )
+        codes = [result.data.decode("utf-8", errors="replace") for result in results]
+        return codes, points
+
+
+class WeChatDecoder(QRDecoder):
+    """OpenCV's CNN based detector, only present in opencv-contrib builds."""
+
+    name = "wechat"
+
+    def __init__(self):
+        detector_cls = getattr(cv2, "wechat_qrcode_WeChatQRCode", None)
+        if detector_cls is None:
+            raise ImportError("OpenCV was built without the wechat_qrcode module")
+        self.detector = detector_cls()
+
+    def decode(self, image):
+        codes, points = self.decode_multi(image)
+        return (codes[0] if codes else ""), points
+
+    def decode_multi(self, image):
+        texts, points = self.detector.detectAndDecode(image)
+        if not texts:
+            return [], None
+        return list(texts), np.asarray(points, dtype=np.float32).reshape(-1, 2)
+
+
+BACKENDS = {
+    OpenCVDecoder.name: OpenCVDecoder,
+    PyzbarDecoder.name: PyzbarDecoder,
+    WeChatDecoder.name: WeChatDecoder,
+}
+
+
+def available_backends() -> dict:
+    """Instantiates every backend that can be loaded in this environment."""
+    decoders = {}
+    for name, cls in BACKENDS.items():
+        try:
+            decoders[name] = cls()
+        except Exception as e:
+            logger.info(f"QR backend '{name}' not available: {e}")
+    return decoders
+
+
+def measure(decoder: QRDecoder, frames, multi: bool = False) -> dict:
+    """Runs `decoder` over `frames` and returns success rate and latencies (ms)."""
+    latencies = []
+    decoded = 0
+    for frame in frames:
+        start = time.perf_counter()
+        if multi:
+            data, _ = decoder.decode_multi(frame)
+        else:
+            data, _ = decoder.decode(frame)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if data:
+            decoded += 1
+
+    total = sum(latencies)
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "frames": n,
+        "decoded": decoded,
+        "success_rate": decoded / n if n else 0.0,
+        "decodes_per_s": decoded / (total / 1000) if total else 0.0,
+        "mean_ms": total / n if n else 0.0,
+        "p50_ms": latencies[n // 2] if n else 0.0,
+        "p95_ms": latencies[min(n - 1, int(n * 0.95))] if n else 0.0,
+    }
+
+
+def load_corpus(path: str, limit: int = 500):
+    """Reads frames from an image directory or a video file."""
+    frames = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if len(frames) >= limit:
+                break
+            image = cv2.imread(os.path.join(path, name))
+            if image is not None:
+                frames.append(image)
+        return frames
+
+    cap = cv2.VideoCapture(path)
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def calibrate(frames, multi: bool = False) -> QRDecoder:
+    """
+    Picks the backend with the best success rate, ties broken by latency.
+    `multi` measures decode_multi, the call scan_camera makes with QR_MULTI.
+    """
+    best, best_key = None, None
+    for name, decoder in available_backends().items():
+        result = measure(decoder, frames, multi)
+        logger.info(
+            f"🔬 QR backend {name}: {result['success_rate']:.0%} decoded, "
+            f"{result['mean_ms']:.1f} ms/frame"
+        )
+        key = (result["success_rate"], -result["mean_ms"])
+        if best_key is None or key > best_key:
+            best, best_key = decoder, key
+
+    if best is None:
+        raise RuntimeError("No QR decoder backend available")
+    return best
+
+
+def select_backend(
+    name: str = "auto", calibration_dir: str = "", multi: bool = False
+) -> str:
+    """
+    Resolves "auto" to the fastest reliable backend from a short calibration
+    run over `calibration_dir` (or synthetic frames), measuring decode_multi
+    with `multi`. Runs once per process and mode, concurrent callers wait for
+    the first one.
+    """
+    with _select_lock:
+        return _select_backend(name, calibration_dir, multi)
+
+
+@lru_cache(maxsize=None)
+def _select_backend(name: str, calibration_dir: str, multi: bool) -> str:
+    name = name.lower()
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown QR decoder backend: {name}")
+        return name
+
+    frames = load_corpus(calibration_dir, limit=30) if calibration_dir else []
+    if not frames:
+        from scanner_parts.synthetic import calibration_frames
+
+        frames = calibration_frames()
+
+    decoder = calibrate(frames, multi)
+    logger.info(f"✅ Using QR backend: {decoder.name}")
+    return decoder.name
+
+
+def create_decoder(
+    name: str = "auto", calibration_dir: str = "", multi: bool = False
+) -> QRDecoder:
+    """
+    Returns a new instance of the configured backend (one per scanner thread).
+    `multi` tells the auto calibration whether decode_multi will be used.
+    """
+    return BACKENDS[select_backend(name, calibration_dir, multi)]()
@@ -0,0 +1,91 @@
+"""
+Capture resolution and frame rate governor for idle versus active periods
+"""
+
+import logging
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = "active"
+IDLE = "idle"
+
+
+class CaptureGovernor:
+    """
+    Drops the camera to a low resolution and frame rate after `idle_after`
+    seconds without motion or a detection and restores the full settings on
+    the next activity. Property changes are handed to the FrameGrabber, which
+    applies them between two reads. Time spent per state is added to the
+    scanner stats as "<state>_seconds".
+    """
+
+    def __init__(
+        self,
+        grabber,
+        stats,
+        idle_after: float = 30.0,
+        idle_size=(320, 240),
+        idle_fps: float = 5.0,
+    ):
+        self.grabber = grabber
+        self.stats = stats
+        self.idle_after = idle_after
+        self.idle_settings = {
+            cv2.CAP_PROP_FRAME_WIDTH: idle_size[0],
+            cv2.CAP_PROP_FRAME_HEIGHT: idle_size[1],
+            cv2.CAP_PROP_FPS: idle_fps,
+        }
+        # Full settings are whatever the device runs at when scanning starts
+        cap = grabber.cap
+        self.enabled = idle_after > 0 and hasattr(cap, "get")
+        self.active_settings = (
+            {prop: cap.get(prop) for prop in self.idle_settings} if self.enabled else {}
+        )
+
+        self.state = ACTIVE
+        now = time.monotonic()
+        self.state_since = now
+        self.last_activity = now
+
+    def _switch(self, state: str, now: float):
+        self.stats.incr(f"{self.state}_seconds", now - self.state_since)
+        self.stats.incr(f"{state}_switches")
+        self.state = state
+        self.state_since = now
+        settings = self.idle_settings if state == IDLE else self.active_settings
+        self.grabber.request(settings)
+        logger.info(f"📷 Capture governor: {state}")
+
+    def activity(self, now=None):
+        """Motion or a detection happened; go back to full settings at once."""
+        now = time.monotonic() if now is None else now
+        self.last_activity = now
+        if self.enabled and self.state == IDLE:
+            self._switch(ACTIVE, now)
+            return True
+        return False
+
+    def tick(self, now=None, active: bool = False) -> bool:
+        """
+        Called for every frame; `active` tells whether motion or a detection
+        happened recently. Returns True if the capture settings were changed.
+        """
+        now = time.monotonic() if now is None else now
+        if active:
+            return self.activity(now)
+        if (
+            self.enabled
+            and self.state == ACTIVE
+            and now - self.last_activity >= self.idle_after
+        ):
+            self._switch(IDLE, now)
+            return True
+        return False
+
+    def close(self):
+        now = time.monotonic()
+        self.stats.incr(f"{self.state}_seconds", now - self.state_since)
+        self.state_since = now
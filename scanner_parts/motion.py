@@ -0,0 +1,95 @@
+"""
+Cheap scene-change detection to gate the QR decoder
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Compares a tiny grayscale thumbnail of each frame with a reference thumbnail.
+    Every thumbnail pixel stands for a block of the frame; a block counts as
+    changed when its gray level moved by at least `threshold` (0-255), and the
+    scene moved when at least the fraction `area` of all blocks changed. Unlike
+    a mean over the whole frame, this does not dilute a small code entering a
+    static scene.
+    The decoder only needs to run on motion, within `hold` seconds after motion
+    or a detection, and once every `idle_interval` seconds while the scene is
+    static (0 disables those probes). A threshold of 0 disables gating.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 12.0,
+        hold: float = 2.0,
+        area: float = 0.005,
+        idle_interval: float = 1.0,
+        size=(64, 48),
+    ):
+        self.threshold = threshold
+        self.hold = hold
+        self.idle_interval = idle_interval
+        self.size = size
+        self.min_blocks = max(1, round(area * size[0] * size[1]))
+        self.reference = None
+        self.active_until = 0.0
+        self.last_decode = float("-inf")
+        self._rebase = False
+
+    def _thumbnail(self, frame):
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+
+    def changed(self, frame) -> bool:
+        """Returns True if the scene moved compared to the reference frame."""
+        thumb = self._thumbnail(frame)
+        if self.reference is None:
+            self.reference = thumb
+            changed, self._rebase = not self._rebase, False
+            return changed
+
+        # The reference is only replaced on a change, so slow drifts add up
+        diff = cv2.absdiff(thumb, self.reference)
+        if np.count_nonzero(diff >= self.threshold) >= self.min_blocks:
+            self.reference = thumb
+            return True
+        return False
+
+    def rebase(self):
+        """Adopts the next frame as reference without reporting a change."""
+        self.reference = None
+        self._rebase = True
+
+    def keep_active(self, now=None):
+        """Keeps the decoder running for `hold` seconds, e.g. after a detection."""
+        now = time.monotonic() if now is None else now
+        self.active_until = now + self.hold
+
+    def active(self, now=None) -> bool:
+        """
+        True within `hold` seconds after motion or a detection. Without gating
+        nothing tells a static scene apart, so the scene always counts as active.
+        """
+        if self.threshold <= 0:
+            return True
+        now = time.monotonic() if now is None else now
+        return now < self.active_until
+
+    def should_decode(self, frame, now=None) -> bool:
+        if self.threshold <= 0:
+            return True
+
+        now = time.monotonic() if now is None else now
+        if self.changed(frame):
+            self.keep_active(now)
+        elif not self.active(now) and (
+            self.idle_interval <= 0 or now - self.last_decode < self.idle_interval
+        ):
+            return False
+
+        self.last_decode = now
+        return True
@@ -0,0 +1,242 @@
+"""
+Frame sources for scan_camera: camera devices, video files, image
+directories and synthetic QR streams. All of them follow the small part of
+the cv2.VideoCapture interface the scanner uses (isOpened/read/release).
+"""
+
+import logging
+import os
+import time
+
+import cv2
+import numpy as np
+from scanner_parts.synthetic import encode_qr
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".pgm", ".ppm")
+
+
+class Pacer:
+    """Sleeps between frames to replay at `fps`; does nothing when not realtime."""
+
+    def __init__(self, fps: float, realtime: bool):
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.realtime = realtime
+        self.next_at = None
+
+    def wait(self):
+        if not self.realtime or not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_at is None:
+            self.next_at = now
+        elif self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(self.next_at + self.interval, now - self.interval)
+
+
+class VideoFileSource:
+    """Replays a video file at its recorded frame rate or as fast as possible."""
+
+    def __init__(self, path: str, realtime: bool = True, fps: float = 0):
+        self.cap = cv2.VideoCapture(path)
+        self.realtime = realtime
+        fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.pacer = Pacer(fps, realtime)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        self.pacer.wait()
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource:
+    """Replays the images of a directory in file name order."""
+
+    def __init__(
+        self, path: str, realtime: bool = True, fps: float = 30.0, loop: bool = False
+    ):
+        self.paths = [
+            os.path.join(path, name)
+            for name in sorted(os.listdir(path))
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        self.realtime = realtime
+        self.loop = loop
+        self.pacer = Pacer(fps, realtime)
+        self.index = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def read(self):
+        if self.index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self.index = 0
+
+        self.pacer.wait()
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+    def release(self):
+        self.paths = []
+
+
+class SyntheticSource:
+    """
+    Generates a reproducible stream in which each code of `codes` appears for
+    `hold` frames (drifting slightly) after `gap` empty frames. The time a code
+    is first handed out is recorded in `first_shown` as ground truth for
+    time-to-first-decode measurements.
+    """
+
+    def __init__(
+        self,
+        codes=None,
+        realtime: bool = True,
+        fps: float = 30.0,
+        hold: int = 30,
+        gap: int = 30,
+        size=(640, 480),
+        module_px: int = 5,
+        loop: bool = False,
+        seed: int = 0,
+    ):
+        self.codes = list(codes or [f"METIMAT-SYNTH-{i:04d}" for i in range(10)])
+        self.realtime = realtime
+        self.hold = hold
+        self.gap = gap
+        self.size = size
+        self.loop = loop
+        self.pacer = Pacer(fps, realtime)
+        self.first_shown = {}
+        self.index = 0
+
+        w, h = size
+        rng = np.random.default_rng(seed)
+        noise = rng.normal(110, 8, (h, w)).clip(0, 255).astype(np.uint8)
+        self.background = cv2.cvtColor(noise, cv2.COLOR_GRAY2BGR)
+        self.qr_images = [
+            cv2.cvtColor(encode_qr(code, module_px), cv2.COLOR_GRAY2BGR)
+            for code in self.codes
+        ]
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.codes) * (self.gap + self.hold)
+
+    def isOpened(self):
+        return bool(self.codes)
+
+    def read(self):
+        if self.index >= self.frame_count:
+            if not self.loop:
+                return False, None
+            self.index = 0
+            self.first_shown.clear()
+
+        self.pacer.wait()
+        code_index, offset = divmod(self.index, self.gap + self.hold)
+        self.index += 1
+
+        frame = self.background.copy()
+        if offset >= self.gap:
+            step = offset - self.gap
+            qr = self.qr_images[code_index]
+            qh, qw = qr.shape[:2]
+            w, h = self.size
+            x = min(w - qw, (w - qw) // 2 + (step % 10) * 3)
+            y = min(h - qh, (h - qh) // 2 + (step % 7) * 2)
+            frame[y : y + qh, x : x + qw] = qr
+            self.first_shown.setdefault(self.codes[code_index], time.monotonic())
+        return True, frame
+
+    def release(self):
+        self.index = self.frame_count
+
+
+def configure_camera(
+    cap,
+    fourcc: str = "",
+    width: int = 0,
+    height: int = 0,
+    fps: float = 0,
+    buffer_size: int = 0,
+    raw: bool = False,
+):
+    """
+    Applies capture format settings to an opened device; 0 / "" keeps the
+    driver default. The FOURCC has to be set before the resolution, because
+    V4L2 drivers validate sizes against the active pixel format. raw=True
+    disables OpenCV's BGR conversion (see to_luma).
+    """
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter.fourcc(*fourcc[:4].ljust(4)))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    if raw:
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+    return cap
+
+
+def describe_camera(cap) -> str:
+    """Returns the format the device actually runs at, e.g. 'MJPG 1280x720@30'."""
+    code = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    return f"{fourcc or '?'} {width}x{height}@{cap.get(cv2.CAP_PROP_FPS):g}"
+
+
+def to_luma(frame):
+    """
+    Returns the grayscale (luma) plane of a frame without a full color
+    conversion where possible: raw YUYV frames carry Y in the first channel,
+    raw MJPEG buffers are decoded straight to grayscale by libjpeg.
+    """
+    if frame.ndim == 2:
+        if frame.shape[0] == 1:
+            return cv2.imdecode(frame, cv2.IMREAD_GRAYSCALE)
+        return frame
+    if frame.shape[2] == 2:
+        return frame[:, :, 0]
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def open_source(source, realtime: bool = True, camera_settings=None):
+    """
+    Opens `source` for scanning: an int (or digit string) camera index, a
+    video file, an image directory or "synthetic" / "synthetic:<n codes>".
+    `camera_settings` are keyword arguments of configure_camera and only
+    apply to camera devices.
+    """
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        cap = cv2.VideoCapture(int(source))
+        if cap.isOpened():
+            if camera_settings:
+                configure_camera(cap, **camera_settings)
+            logger.info(f"📷 Camera {source}: {describe_camera(cap)}")
+        return cap
+    if not isinstance(source, str):
+        return source
+    if source.startswith("synthetic"):
+        _, _, count = source.partition(":")
+        codes = [f"METIMAT-SYNTH-{i:04d}" for i in range(int(count or 10))]
+        return SyntheticSource(codes, realtime=realtime)
+    if os.path.isdir(source):
+        return ImageDirectorySource(source, realtime=realtime)
+    return VideoFileSource(source, realtime=realtime)
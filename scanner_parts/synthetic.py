@@ -0,0 +1,64 @@
+"""
+Synthetic QR frames for calibration and benchmarks without a camera
+"""
+
+import cv2
+import numpy as np
+
+
+def encode_qr(text: str, module_px: int = 6):
+    """Returns a grayscale image of `text` as QR code including its quiet zone."""
+    encoder = cv2.QRCodeEncoder.create()
+    qr = encoder.encode(text)
+    return cv2.resize(
+        qr, None, fx=module_px, fy=module_px, interpolation=cv2.INTER_NEAREST
+    )
+
+
+def make_qr_frame(
+    text: str,
+    size=(640, 480),
+    module_px: int = 6,
+    position=None,
+    noise: float = 8.0,
+    seed: int = 0,
+):
+    """
+    Renders `text` as QR code onto a noisy gray BGR frame of `size` (w, h).
+    `position` is the top-left corner of the code; None centers it.
+    """
+    w, h = size
+    rng = np.random.default_rng(seed)
+    frame = np.full((h, w), 110, dtype=np.float32)
+    frame += rng.normal(0, noise, (h, w)).astype(np.float32)
+
+    qr = encode_qr(text, module_px)
+    qh, qw = qr.shape[:2]
+    if qw > w or qh > h:
+        raise ValueError("QR code does not fit into the frame")
+
+    if position is None:
+        position = ((w - qw) // 2, (h - qh) // 2)
+    x, y = position
+    x = min(max(0, x), w - qw)
+    y = min(max(0, y), h - qh)
+    frame[y : y + qh, x : x + qw] = qr
+
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+
+def calibration_frames(count: int = 6, size=(640, 480)):
+    """A small, deterministic set of frames with codes at various sizes and spots."""
+    frames = []
+    for i in range(count):
+        module_px = 3 + i % 4
+        position = ((i * 97) % size[0], (i * 61) % size[1])
+        try:
+            frame = make_qr_frame(
+                f"METIMAT-CALIBRATION-{i:04d}", size, module_px, position, seed=i
+            )
+        except ValueError:
+            frame = make_qr_frame(f"METIMAT-CALIBRATION-{i:04d}", size, 3, seed=i)
+        frames.append(frame)
+    return frames
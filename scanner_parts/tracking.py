@@ -0,0 +1,107 @@
+"""
+Region-of-interest tracking of the last detected QR code
+"""
+
+import cv2
+import numpy as np
+
+
+class RegionOfInterest:
+    """Image handed to the decoder plus the mapping back to frame coordinates."""
+
+    def __init__(self, image, x: int = 0, y: int = 0, scale: float = 1.0):
+        self.image = image
+        self.x = x
+        self.y = y
+        self.scale = scale
+
+    @property
+    def is_full_frame(self) -> bool:
+        return self.x == 0 and self.y == 0 and self.scale == 1.0
+
+    def to_frame(self, points):
+        """Maps decoder points of the region back to full-frame coordinates."""
+        pts = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        return pts / self.scale + (self.x, self.y)
+
+
+class RoiTracker:
+    """
+    Remembers where the last code was found so following frames only search a
+    padded crop around it. After `max_misses` frames without a detection the
+    tracker gives up and the full frame is searched again. With `full_every`,
+    every n-th tracked frame is searched in full anyway, so codes appearing
+    next to the tracked ones are found (multi-code decoding).
+    """
+
+    def __init__(
+        self,
+        padding: float = 0.5,
+        scale: float = 1.0,
+        max_misses: int = 5,
+        full_every: int = 0,
+    ):
+        self.padding = padding
+        self.scale = scale
+        self.max_misses = max_misses
+        self.full_every = full_every
+        self.box = None  # (x0, y0, x1, y1) in frame coordinates
+        self.misses = 0
+        self.since_full = 0
+
+    @property
+    def tracking(self) -> bool:
+        return self.box is not None
+
+    def region(self, frame) -> RegionOfInterest:
+        if self.box is None:
+            return RegionOfInterest(frame)
+
+        self.since_full += 1
+        if self.full_every > 0 and self.since_full >= self.full_every:
+            # A full-frame detection re-centers the box on all codes in view
+            self.since_full = 0
+            return RegionOfInterest(frame)
+
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.box
+        pad_x = (x1 - x0) * self.padding
+        pad_y = (y1 - y0) * self.padding
+        x0 = max(0, int(x0 - pad_x))
+        y0 = max(0, int(y0 - pad_y))
+        x1 = min(w, int(x1 + pad_x) + 1)
+        y1 = min(h, int(y1 + pad_y) + 1)
+
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            self.reset()
+            return RegionOfInterest(frame)
+
+        crop = frame[y0:y1, x0:x1]
+        if self.scale != 1.0:
+            crop = cv2.resize(
+                crop, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA
+            )
+        return RegionOfInterest(crop, x0, y0, self.scale)
+
+    def update(self, roi: RegionOfInterest, bbox):
+        """Feeds the decoder result (bbox or None) of the region back in."""
+        if bbox is not None and len(bbox) > 0:
+            pts = roi.to_frame(bbox)
+            self.box = (
+                float(pts[:, 0].min()),
+                float(pts[:, 1].min()),
+                float(pts[:, 0].max()),
+                float(pts[:, 1].max()),
+            )
+            self.misses = 0
+            return
+
+        if self.box is not None:
+            self.misses += 1
+            if self.misses >= self.max_misses:
+                self.reset()
+
+    def reset(self):
+        self.box = None
+        self.misses = 0
+        self.since_full = 0
@@ -0,0 +1,186 @@
+"""
+Lightweight per-scan latency tracing from frame capture to GUI result
+"""
+
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                break
+        else:
+            i = len(BUCKETS_MS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "buckets_ms": list(BUCKETS_MS) + ["inf"],
+            "counts": self.counts,
+        }
+
+
+class Trace:
+    def __init__(self, scan_id: int, payload: str):
+        self.scan_id = scan_id
+        self.payload = payload
+        self.stages = []  # [(stage, monotonic time)]
+        self.committed = False
+
+    def to_dict(self) -> dict:
+        start = self.stages[0][1]
+        return {
+            "scan_id": self.scan_id,
+            "payload": self.payload,
+            "stages": [(stage, (t - start) * 1000) for stage, t in self.stages],
+        }
+
+
+class Tracer:
+    """
+    Follows a decoded payload through the stages of a scan: capture, decode,
+    dedup, http_start/http_done, led and gui. Traces are keyed by payload;
+    a trace becomes committed once the deduplicator let it through, and a
+    committed trace is not replaced by later frames showing the same code.
+    Finished traces feed one histogram per stage transition plus "total".
+    Every method returns immediately when tracing is disabled.
+    """
+
+    def __init__(self, enabled: bool = False, max_traces: int = 500):
+        self.enabled = enabled
+        self.max_traces = max_traces
+        self._ids = itertools.count(1)
+        self._active = OrderedDict()
+        self._finished = deque(maxlen=max_traces)
+        self._histograms = {}
+        # Batches handed to the GUI, in the order their pages get painted
+        self._displaying = deque()
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, max_traces: int):
+        """Applies the settings at startup; the global tracer exists at import."""
+        with self._lock:
+            self.enabled = enabled
+            self.max_traces = max_traces
+            self._finished = deque(self._finished, maxlen=max_traces)
+            while len(self._active) > max_traces:
+                self._active.popitem(last=False)
+
+    def start(self, payload: str, captured_at: float):
+        """Begins a trace at frame capture time, decoded just now."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            current = self._active.get(payload)
+            if current is not None and current.committed:
+                return
+            trace = Trace(next(self._ids), payload)
+            trace.stages = [("capture", captured_at), ("decode", now)]
+            self._active[payload] = trace
+            self._active.move_to_end(payload)
+            while len(self._active) > self.max_traces:
+                self._active.popitem(last=False)
+
+    def mark(self, payload: str, stage: str):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            trace = self._active.get(payload)
+            if trace is not None:
+                trace.stages.append((stage, now))
+                if stage == "dedup":
+                    trace.committed = True
+
+    def discard(self, payload: str, committed: bool = False):
+        """
+        Drops an uncommitted trace, e.g. of a duplicate the dedup rejected.
+        committed=True also drops a committed one, e.g. of a scan that was
+        never sent, so a rescan starts a fresh trace.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            trace = self._active.get(payload)
+            if trace is not None and (committed or not trace.committed):
+                del self._active[payload]
+
+    def displaying(self, payloads):
+        """
+        Records the LED change and queues the scans of one result page; each
+        page shown by the GUI is matched with one displayed() call.
+        """
+        if not self.enabled:
+            return
+        for payload in payloads:
+            self.mark(payload, "led")
+        with self._lock:
+            self._displaying.append(list(payloads))
+
+    def displayed(self):
+        """Called by the GUI after a result page was painted; ends its traces."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not self._displaying:
+                return
+            for payload in self._displaying.popleft():
+                trace = self._active.pop(payload, None)
+                if trace is None:
+                    continue
+                trace.stages.append(("gui", now))
+                self._record(trace)
+
+    def _record(self, trace: Trace):
+        stages = trace.stages
+        for (prev, t0), (stage, t1) in zip(stages, stages[1:]):
+            self._histogram(f"{prev}->{stage}").add((t1 - t0) * 1000)
+        self._histogram("total").add((stages[-1][1] - stages[0][1]) * 1000)
+        self._finished.append(trace.to_dict())
+
+    def _histogram(self, name: str) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram()
+        return histogram
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {name: h.to_dict() for name, h in self._histograms.items()}
+
+    def export(self, path: str):
+        """Writes histograms and the recent finished traces as JSON."""
+        with self._lock:
+            data = {
+                "exported_at": time.time(),
+                "histograms": {n: h.to_dict() for n, h in self._histograms.items()},
+                "traces": list(self._finished),
+            }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+# Global tracer instance, configured by main.py
+tracer = Tracer()